@@ -1,9 +1,22 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from accounts import audit, bulk
 from accounts.admin_site import admin_site
-from accounts.models import Department, User, UserRole
+from accounts.duplicates import merge
+from accounts.models import (
+    AuditAction,
+    AuditEntry,
+    Department,
+    DuplicateCandidate,
+    DuplicateStatus,
+    User,
+    UserRole,
+)
 
 
 class RoleAdminPermissionMixin:
@@ -63,10 +76,24 @@ class DepartmentAdmin(RoleAdminPermissionMixin, admin.ModelAdmin):
     search_fields = ("name", "faculty_coordinator__email", "student_coordinator__email")
 
 
+class UserActionForm(ActionForm):
+    role = forms.ChoiceField(choices=[("", "---------"), *UserRole.choices], required=False)
+    department = forms.ModelChoiceField(Department.objects.all(), required=False)
+
+
 @admin.register(User, site=admin_site)
 class UserAdmin(RoleAdminPermissionMixin, DjangoUserAdmin):
     model_key = "user"
 
+    action_form = UserActionForm
+    actions = (
+        "assign_department",
+        "change_role",
+        "promote_to_student_coordinator",
+        "activate",
+        "deactivate",
+    )
+
     ordering = ("email",)
     list_display = (
         "email",
@@ -149,6 +176,12 @@ class UserAdmin(RoleAdminPermissionMixin, DjangoUserAdmin):
         role = self._role(request)
         return role == UserRole.ADMIN
 
+    def has_bulk_change_permission(self, request):
+        return self._role(request) in (UserRole.ADMIN, UserRole.FACULTY_COORDINATOR)
+
+    def has_manage_permission(self, request):
+        return self._role(request) == UserRole.ADMIN
+
     def get_readonly_fields(self, request, obj=None):
         role = self._role(request)
 
@@ -205,6 +238,15 @@ class UserAdmin(RoleAdminPermissionMixin, DjangoUserAdmin):
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
 
+        if "role" in form.changed_data:
+            audit.record(
+                AuditAction.ROLE_CHANGED,
+                actor_id=request.user.pk,
+                user_id=obj.pk,
+                old_role=form.initial.get("role") if change else None,
+                new_role=obj.role,
+            )
+
         # Auto-assign coordinators to department
         if obj.role == UserRole.FACULTY_COORDINATOR and obj.department:
             Department.objects.filter(
@@ -224,4 +266,158 @@ class UserAdmin(RoleAdminPermissionMixin, DjangoUserAdmin):
             ).update(student_coordinator=None)
 
             obj.department.student_coordinator = obj
-            obj.department.save()
\ No newline at end of file
+            obj.department.save()
+
+    def _editable(self, request, queryset):
+        # the same users has_change_permission allows one by one; never the
+        # requester, so nobody demotes or locks out themselves by accident
+        queryset = queryset.exclude(pk=request.user.pk)
+        if self._role(request) == UserRole.FACULTY_COORDINATOR:
+            queryset = queryset.filter(
+                department=request.user.department,
+                role__in=(UserRole.STUDENT, UserRole.STUDENT_COORDINATOR),
+            )
+        return list(queryset.values_list("id", flat=True))
+
+    def _action_value(self, request, name):
+        form = self.action_form(request.POST)
+        form.fields["action"].choices = self.get_action_choices(request)
+        return form.cleaned_data.get(name) if form.is_valid() else None
+
+    def _report(self, request, queryset, user_ids, message, without_department=()):
+        skipped = queryset.count() - len(user_ids)
+        if skipped:
+            message += f" Skipped {skipped} user(s) you can't change."
+        if without_department:
+            message += f" Skipped {len(without_department)} user(s) without a department."
+        self.message_user(request, message, messages.SUCCESS)
+
+    @admin.action(description="Move selected users to the chosen department", permissions=("manage",))
+    def assign_department(self, request, queryset):
+        department = self._action_value(request, "department")
+        if department is None:
+            self.message_user(request, "Choose a department.", messages.ERROR)
+            return
+        user_ids = self._editable(request, queryset)
+        moved = bulk.assign_department(user_ids, department)
+        self._report(request, queryset, user_ids, f"Moved {moved} user(s) to {department}.")
+
+    @admin.action(description="Change role of selected users to the chosen role", permissions=("bulk_change",))
+    def change_role(self, request, queryset):
+        role = self._action_value(request, "role")
+        if not role:
+            self.message_user(request, "Choose a role.", messages.ERROR)
+            return
+        if self._role(request) == UserRole.FACULTY_COORDINATOR and role not in (
+            UserRole.STUDENT,
+            UserRole.STUDENT_COORDINATOR,
+        ):
+            self.message_user(request, "You can only assign the student roles.", messages.ERROR)
+            return
+        self._change_role(request, queryset, role)
+
+    @admin.action(description="Make student coordinator of their department", permissions=("bulk_change",))
+    def promote_to_student_coordinator(self, request, queryset):
+        self._change_role(request, queryset, UserRole.STUDENT_COORDINATOR)
+
+    def _change_role(self, request, queryset, role):
+        user_ids = self._editable(request, queryset)
+        try:
+            changed, without_department = bulk.change_role(user_ids, role, actor_id=request.user.pk)
+        except ValueError as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            return
+        self._report(
+            request,
+            queryset,
+            user_ids,
+            f"Changed {changed} user(s) to {UserRole(role).label}.",
+            without_department,
+        )
+
+    @admin.action(description="Activate selected users", permissions=("manage",))
+    def activate(self, request, queryset):
+        user_ids = self._editable(request, queryset)
+        changed = bulk.set_active(user_ids, True)
+        self._report(request, queryset, user_ids, f"Activated {changed} user(s).")
+
+    @admin.action(description="Deactivate selected users", permissions=("manage",))
+    def deactivate(self, request, queryset):
+        user_ids = self._editable(request, queryset)
+        changed = bulk.set_active(user_ids, False)
+        self._report(request, queryset, user_ids, f"Deactivated {changed} user(s).")
+
+
+@admin.register(AuditEntry, site=admin_site)
+class AuditEntryAdmin(RoleAdminPermissionMixin, admin.ModelAdmin):
+    model_key = "audit"
+
+    list_display = ("created_at", "action", "actor_id", "user_id", "event_id")
+    list_filter = ("action",)
+    search_fields = ("=user_id", "=event_id", "=actor_id")
+    date_hierarchy = "created_at"
+
+    def has_view_permission(self, request, obj=None):
+        return self._role(request) == UserRole.ADMIN
+
+    # the audit trail is append-only, even for admins
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DuplicateCandidate, site=admin_site)
+class DuplicateCandidateAdmin(RoleAdminPermissionMixin, admin.ModelAdmin):
+    """Merge queue for students flagged by the roster duplicate check."""
+
+    model_key = "duplicate"
+
+    list_display = ("user", "duplicate_of", "score", "reason", "status", "created_at")
+    list_filter = ("status", "reason")
+    search_fields = ("user__full_name", "user__register_number", "duplicate_of__full_name", "duplicate_of__register_number")
+    list_select_related = ("user", "duplicate_of")
+    readonly_fields = ("user", "duplicate_of", "score", "reason", "status", "created_at", "resolved_at", "resolved_by")
+    actions = ("merge_into_existing", "dismiss")
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if self._role(request) == UserRole.ADMIN:
+            return qs
+        # others only see pairs within their own department
+        department_id = request.user.department_id
+        if department_id is None:
+            return qs.none()
+        return qs.filter(user__department_id=department_id, duplicate_of__department_id=department_id)
+
+    @admin.action(description="Merge into the existing student", permissions=("change",))
+    def merge_into_existing(self, request, queryset):
+        merged = 0
+        for candidate in queryset.filter(status=DuplicateStatus.PENDING).select_related("user", "duplicate_of"):
+            # an earlier merge in this batch may have removed one side
+            candidate.refresh_from_db()
+            if candidate.status != DuplicateStatus.PENDING or not candidate.user or not candidate.duplicate_of:
+                continue
+            try:
+                merge(candidate, request.user)
+            except ValueError as exc:
+                self.message_user(request, f"Not merged {candidate.user}: {exc}", messages.ERROR)
+                continue
+            merged += 1
+        self.message_user(request, f"Merged {merged} duplicate(s).", messages.SUCCESS)
+
+    @admin.action(description="Not a duplicate", permissions=("change",))
+    def dismiss(self, request, queryset):
+        dismissed = queryset.filter(status=DuplicateStatus.PENDING).update(
+            status=DuplicateStatus.DISMISSED,
+            resolved_at=timezone.now(),
+            resolved_by=request.user,
+        )
+        self.message_user(request, f"Dismissed {dismissed} candidate(s).", messages.SUCCESS)
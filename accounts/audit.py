@@ -0,0 +1,58 @@
+"""
+Buffered audit trail.
+
+``record()`` only appends to an in-process queue; a background worker
+writes entries in batches with ``bulk_create``, keeping audit writes off
+the request path. ``AuditActorMiddleware`` remembers the logged-in user
+so signal handlers can attribute changes they observe.
+"""
+import contextvars
+
+from django.conf import settings
+from django.utils import timezone
+
+from meet.batching import BatchWriter
+from .models import AuditEntry
+
+
+_actor = contextvars.ContextVar("audit_actor", default=None)
+
+
+def current_actor_id():
+    return _actor.get()
+
+
+class AuditActorMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = getattr(request, "user", None)
+        token = _actor.set(user.pk if user is not None and user.is_authenticated else None)
+        try:
+            return self.get_response(request)
+        finally:
+            _actor.reset(token)
+
+
+def record(action, actor_id=None, user_id=None, event_id=None, **details):
+    writer.put(AuditEntry(
+        action=action,
+        actor_id=actor_id if actor_id is not None else current_actor_id(),
+        user_id=user_id,
+        event_id=event_id,
+        details=details,
+        created_at=timezone.now(),
+    ))
+
+
+def _write_batch(entries):
+    AuditEntry.objects.bulk_create(entries)
+
+
+writer = BatchWriter(
+    _write_batch,
+    batch_size=getattr(settings, "AUDIT_BATCH_SIZE", 500),
+    interval=getattr(settings, "AUDIT_FLUSH_INTERVAL", 1.0),
+    name="audit-log",
+)
@@ -0,0 +1,42 @@
+import copy
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that serves the per-request user lookup from the cache.
+
+    Entries are dropped whenever the user is saved or deleted (see
+    accounts/signals.py), so role, password and activation changes take
+    effect on the next request. The cached copy leaves out the password
+    hash and carries the session hash instead (see ``User.get_session_auth_hash``).
+    """
+
+    def get_user(self, user_id):
+        if settings.AUTH_USER_CACHE_TIMEOUT <= 0:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, _cacheable(user), settings.AUTH_USER_CACHE_TIMEOUT)
+        elif not self.user_can_authenticate(user):
+            return None
+        return user
+
+
+def _cacheable(user):
+    cached = copy.copy(user)
+    cached._session_auth_hash = user.get_session_auth_hash()
+    # deferred: loaded from the database if anything needs it, and save()
+    # leaves it alone
+    del cached.__dict__["password"]
+    return cached
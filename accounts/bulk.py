@@ -0,0 +1,118 @@
+"""
+Set-based changes to many users at once, for the ``UserAdmin`` bulk actions.
+
+Each function changes every selected user with one ``UPDATE`` (plus one
+to move department coordinator slots) inside a transaction, instead of
+saving users one by one. That bypasses the model signals, so the cached
+users and the student fragments are invalidated directly.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from accounts import audit
+from meet import changelog
+from .models import AuditAction, Department, User, UserRole
+from .signals import users_changed
+
+
+COORDINATOR_SLOTS = {
+    UserRole.FACULTY_COORDINATOR: "faculty_coordinator",
+    UserRole.STUDENT_COORDINATOR: "student_coordinator",
+}
+
+
+def _release_slots(user_ids):
+    for field in COORDINATOR_SLOTS.values():
+        Department.objects.filter(**{f"{field}__in": user_ids}).update(**{field: None})
+
+
+def _role_fields(role):
+    # User.save() keeps is_staff in step with the role; superusers keep theirs
+    return {
+        "role": role,
+        "is_staff": Case(When(is_superuser=True, then=F("is_staff")), default=Value(role != UserRole.STUDENT)),
+    }
+
+
+def _audit_roles(previous, role, actor_id):
+    for user_id, old_role in previous:
+        if old_role != role:
+            audit.record(AuditAction.ROLE_CHANGED, actor_id=actor_id, user_id=user_id, old_role=old_role, new_role=role)
+
+
+def assign_department(user_ids, department):
+    """
+    Move ``user_ids`` to ``department``; return how many moved.
+
+    Coordinators lose the slot of the department they leave, and don't
+    take the new one until promoted.
+    """
+    with transaction.atomic():
+        previous = dict(
+            User.objects.filter(id__in=user_ids).exclude(department=department).values_list("id", "department_id")
+        )
+        moved = list(previous)
+        _release_slots(moved)
+        User.objects.filter(id__in=moved).update(department=department)
+        changelog.record_department_moves(previous)
+        users_changed(moved)
+    return len(moved)
+
+
+def change_role(user_ids, role, actor_id=None):
+    """Give ``user_ids`` ``role``; return ``(changed, skipped_ids)`` like ``promote``."""
+    if role in COORDINATOR_SLOTS:
+        return promote(user_ids, role, actor_id)
+    with transaction.atomic():
+        previous = list(User.objects.filter(id__in=user_ids).exclude(role=role).values_list("id", "role"))
+        changed = [user_id for user_id, _ in previous]
+        _release_slots(changed)
+        User.objects.filter(id__in=changed).update(**_role_fields(role))
+        users_changed(changed)
+    _audit_roles(previous, role, actor_id)
+    return len(changed), []
+
+
+def promote(user_ids, role, actor_id=None):
+    """
+    Make ``user_ids`` coordinators (``role``) of their own departments.
+
+    Returns ``(promoted, skipped_ids)``; users without a department are
+    skipped. Whoever held a slot before is replaced, as when a coordinator
+    is saved through the admin form.
+    Raises ``ValueError`` if two users would take the same slot.
+    """
+    field = COORDINATOR_SLOTS[role]
+    with transaction.atomic():
+        rows = list(
+            User.objects.select_for_update()
+            .filter(id__in=user_ids, department__isnull=False)
+            .values_list("id", "role", "department_id")
+        )
+        slots = {}
+        for user_id, _, department_id in rows:
+            if department_id in slots:
+                raise ValueError("Select at most one coordinator per department.")
+            slots[department_id] = user_id
+
+        promoted = list(slots.values())
+        # free the users' old slots first so the one-to-one stays unique row by row
+        _release_slots(promoted)
+        User.objects.filter(id__in=promoted).update(**_role_fields(role))
+        if slots:
+            Department.objects.filter(id__in=slots).update(**{
+                field: Case(*(When(id=department_id, then=Value(user_id)) for department_id, user_id in slots.items()))
+            })
+        users_changed(promoted)
+    _audit_roles([(user_id, old_role) for user_id, old_role, _ in rows], role, actor_id)
+    skipped = sorted(set(user_ids) - {user_id for user_id, _, _ in rows})
+    return len(promoted), skipped
+
+
+def set_active(user_ids, active):
+    """Activate or deactivate ``user_ids``; return how many changed."""
+    with transaction.atomic():
+        changed = list(User.objects.filter(id__in=user_ids).exclude(is_active=active).values_list("id", flat=True))
+        User.objects.filter(id__in=changed).update(is_active=active)
+        users_changed(changed)
+    return len(changed)
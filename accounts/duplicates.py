@@ -0,0 +1,284 @@
+"""
+Fuzzy duplicate-student detection.
+
+Comparing every incoming student with every existing one is quadratic,
+so each person gets a few blocking keys instead: the email local part,
+the name tokens in sorted order, and the soundex codes of the first and
+last name token. Only people who share a key are compared, with difflib.
+Blocks stop growing at ``MAX_BLOCK`` people, so very common names cannot
+make one comparison expensive.
+"""
+import difflib
+import re
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import audit
+from .models import AuditAction, DuplicateCandidate, DuplicateStatus, User
+
+
+THRESHOLD = 0.85
+MAX_BLOCK = 50
+MAX_MATCHES = 5  # per person; beyond that a reviewer learns nothing new
+
+# name similarity is topped up by these before comparing with THRESHOLD
+SAME_EMAIL_BONUS = 0.1
+SAME_DEPARTMENT_BONUS = 0.05
+
+Person = namedtuple("Person", "ref full_name register_number email department name email_local keys")
+Match = namedtuple("Match", "person other score reason")
+
+_SOUNDEX = {
+    char: digit
+    for letters, digit in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6"))
+    for char in letters
+}
+
+
+def soundex(word):
+    word = word.lower()
+    code = word[0].upper()
+    previous = _SOUNDEX.get(word[0], "")
+    for char in word[1:]:
+        digit = _SOUNDEX.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if char not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def name_tokens(full_name):
+    return re.findall(r"[^\W\d_]+", (full_name or "").lower())
+
+
+def email_local(email):
+    return re.sub(r"[^a-z0-9]", "", (email or "").split("@")[0].lower())
+
+
+def profile(ref, full_name, register_number, email, department):
+    tokens = name_tokens(full_name)
+    name = " ".join(sorted(tokens))
+    local = email_local(email)
+
+    keys = []
+    if local:
+        keys.append(("email", local))
+    if name:
+        keys.append(("name", name))
+    if len(tokens) > 1:
+        keys.append(("sound", "-".join(sorted((soundex(tokens[0]), soundex(tokens[-1]))))))
+
+    return Person(ref, full_name, register_number or None, email, department or None, name, local, keys)
+
+
+def similarity(a, b, matcher=None):
+    """
+    Name similarity of ``a`` and ``b`` plus the email/department bonuses.
+
+    ``matcher`` may be a ``SequenceMatcher`` already holding ``a.name`` as its
+    second sequence; difflib caches its analysis of that side.
+    """
+    if a.name == b.name:
+        score = 1.0
+    else:
+        if matcher is None:
+            matcher = difflib.SequenceMatcher(None, autojunk=False)
+            matcher.set_seq2(a.name)
+        matcher.set_seq1(b.name)
+        floor = THRESHOLD - SAME_EMAIL_BONUS - SAME_DEPARTMENT_BONUS
+        if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+            return 0.0
+        score = matcher.ratio()
+
+    if a.email_local and a.email_local == b.email_local:
+        score += SAME_EMAIL_BONUS
+    if a.department and a.department == b.department:
+        score += SAME_DEPARTMENT_BONUS
+    return min(score, 1.0)
+
+
+class DuplicateIndex:
+    def __init__(self):
+        self.blocks = defaultdict(list)
+        self.register_numbers = set()
+
+    def add(self, person):
+        if person.register_number:
+            self.register_numbers.add(person.register_number)
+        for key in person.keys:
+            block = self.blocks[key]
+            if len(block) < MAX_BLOCK:
+                block.append(person)
+
+    def add_users(self, users):
+        rows = users.values_list("id", "full_name", "register_number", "email", "department__name")
+        for pk, full_name, register_number, email, department in rows.iterator(chunk_size=5000):
+            self.add(profile(("user", pk), full_name, register_number, email, department))
+
+    def matches(self, person):
+        """People already in the index who look like ``person``, best first."""
+        matcher = difflib.SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(person.name)
+        compared = set()
+        found = []
+        for key in person.keys:
+            for other in self.blocks.get(key, ()):
+                if other.ref == person.ref or other.ref in compared:
+                    continue
+                compared.add(other.ref)
+                score = similarity(person, other, matcher)
+                if score >= THRESHOLD:
+                    found.append(Match(person, other, score, key[0]))
+        found.sort(key=lambda match: -match.score)
+        return found[:MAX_MATCHES]
+
+
+def find_roster_duplicates(rows):
+    """
+    Possible duplicates for validated roster ``rows`` (``(line, row)`` pairs),
+    against existing users and earlier rows of the same file. Rows whose
+    register number already exists update that user and are skipped.
+    """
+    index = DuplicateIndex()
+    index.add_users(User.objects.all())
+
+    matches = []
+    for line, row in rows:
+        person = profile(
+            ("row", line),
+            row.get("full_name"),
+            (row.get("register_number") or "").strip(),
+            (row.get("email") or "").strip(),
+            (row.get("department") or "").strip(),
+        )
+        if person.register_number in index.register_numbers:
+            continue
+        matches.extend(index.matches(person))
+        index.add(person)
+    return matches
+
+
+def flag(matches):
+    """Queue ``matches`` for review; roster rows are resolved to users by register number."""
+    register_numbers = {
+        person.register_number
+        for match in matches
+        for person in (match.person, match.other)
+        if person.ref[0] == "row"
+    }
+    ids = dict(User.objects.filter(register_number__in=register_numbers).values_list("register_number", "id"))
+
+    def user_id(person):
+        return person.ref[1] if person.ref[0] == "user" else ids.get(person.register_number)
+
+    candidates = [
+        DuplicateCandidate(
+            user_id=user_id(match.person),
+            duplicate_of_id=user_id(match.other),
+            score=round(match.score, 3),
+            reason=match.reason,
+        )
+        for match in matches
+        if user_id(match.person) and user_id(match.other)
+    ]
+    DuplicateCandidate.objects.bulk_create(candidates, ignore_conflicts=True)
+    return len(candidates)
+
+
+def _move_check_in(registration, keep):
+    # the person checked in once, whichever registration recorded it; keep the earliest
+    from meet.models import CheckIn
+
+    check_in = CheckIn.objects.filter(registration=registration).first()
+    if check_in is None:
+        return
+    kept = CheckIn.objects.filter(registration_id=keep).first()
+    if kept is None or check_in.checked_in_at < kept.checked_in_at:
+        CheckIn.objects.update_or_create(
+            registration_id=keep,
+            defaults={"checked_in_at": check_in.checked_in_at, "checked_in_by_id": check_in.checked_in_by_id},
+        )
+    check_in.delete()
+
+
+def merge(candidate, actor):
+    """
+    Fold ``candidate.user`` into ``candidate.duplicate_of`` and delete it.
+
+    Registrations move to the remaining user. Where it is already in the
+    event, the duplicate registration is dropped, but its results and
+    check-in move over to the remaining one first. Its blank profile
+    fields are filled from the other one.
+
+    Raises ``ValueError`` (and changes nothing) if both have a result for
+    the same round of an event.
+    """
+    from meet.bibs import assign_for_registrations
+    from meet.models import Registration, Result
+    from meet.versions import bump
+
+    source, target = candidate.user, candidate.duplicate_of
+
+    with transaction.atomic():
+        taken = dict(Registration.objects.filter(participant=target).values_list("event_id", "id"))
+        moved = []
+        # saved one by one so the registration signals keep caches, feed and sync in step
+        for registration in Registration.objects.filter(participant=source).select_related("event"):
+            keep = taken.get(registration.event_id)
+            if keep is None:
+                registration.participant = target
+                registration.save()
+                moved.append((registration.event_id, target.pk))
+                continue
+
+            rounds = set(Result.objects.filter(registration_id=keep).values_list("round", flat=True))
+            clashes = sorted(rounds & set(registration.results.values_list("round", flat=True)))
+            if clashes:
+                raise ValueError(
+                    f"Both have results for round {', '.join(map(str, clashes))} of {registration.event.name}; "
+                    "fix the results before merging."
+                )
+            registration.results.update(registration_id=keep)
+            _move_check_in(registration, keep)
+            transaction.on_commit(lambda event_id=registration.event_id: bump(f"checkins:{event_id}"))
+            registration.delete()
+
+        fields = [name for name in ("full_name", "gender", "department") if not getattr(target, name) and getattr(source, name)]
+        for name in fields:
+            setattr(target, name, getattr(source, name))
+        if fields:
+            target.save()
+
+        DuplicateCandidate.objects.filter(
+            Q(user=source) | Q(duplicate_of=source),
+            status=DuplicateStatus.PENDING,
+        ).exclude(pk=candidate.pk).update(
+            status=DuplicateStatus.DISMISSED,
+            resolved_at=timezone.now(),
+            resolved_by=actor,
+        )
+
+        candidate.status = DuplicateStatus.MERGED
+        candidate.resolved_at = timezone.now()
+        candidate.resolved_by = actor
+        candidate.save()
+
+        audit.record(
+            AuditAction.USERS_MERGED,
+            actor_id=actor.pk,
+            user_id=target.pk,
+            merged_user_id=source.pk,
+            merged_email=source.email,
+            merged_register_number=source.register_number,
+            registrations_moved=len(moved),
+        )
+        source.delete()
+
+    if moved:
+        assign_for_registrations(moved)
@@ -3,6 +3,11 @@ from .models import User, UserRole, Department
 
 class StudentBulkUploadForm(forms.Form):
     csv_file = forms.FileField()
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Dry run (validate only, nothing is saved)",
+    )
     
     
 class ManualStudentAddForm(forms.ModelForm):
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.duplicates import DuplicateIndex, flag, profile
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Scan every user for likely duplicates and queue them for review in the admin."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many pairs would be flagged.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = DuplicateIndex()
+        matches = []
+        users = User.objects.order_by("id").values_list("id", "full_name", "register_number", "email", "department__name")
+        # each user is compared with earlier ones only, so a pair is found once
+        for pk, full_name, register_number, email, department in users.iterator(chunk_size=5000):
+            person = profile(("user", pk), full_name, register_number, email, department)
+            matches.extend(index.matches(person))
+            index.add(person)
+
+        flagged = len(matches) if options["dry_run"] else flag(matches)
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Found' if options['dry_run'] else 'Flagged'} {flagged} possible duplicate(s)"
+            f" in {time.perf_counter() - started:.2f} s"
+        ))
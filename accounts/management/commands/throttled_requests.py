@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.throttling import throttled_counts
+
+
+class Command(BaseCommand):
+    help = "Show how many requests each rate-limit scope has rejected."
+
+    def handle(self, *args, **options):
+        for scope, count in throttled_counts().items():
+            self.stdout.write(f"{scope:>10}: {count}")
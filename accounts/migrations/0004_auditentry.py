@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_gender'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('REGISTRATION_CREATED', 'Registration created'), ('REGISTRATION_DELETED', 'Registration deleted'), ('ROLE_CHANGED', 'Role changed'), ('ROSTER_IMPORTED', 'Roster imported')], max_length=32)),
+                ('actor_id', models.BigIntegerField(blank=True, null=True)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('event_id', models.BigIntegerField(blank=True, null=True)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'audit entries',
+                'ordering': ('-created_at',),
+                'indexes': [models.Index(fields=['user_id', 'created_at'], name='audit_user_history'), models.Index(fields=['event_id', 'created_at'], name='audit_event_history')],
+            },
+        ),
+    ]
@@ -104,6 +104,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    def get_session_auth_hash(self):
+        # users served from the auth cache carry the hash, not the password;
+        # once a password is loaded or set (set_password), it decides
+        if "password" not in self.__dict__ and "_session_auth_hash" in self.__dict__:
+            return self.__dict__["_session_auth_hash"]
+        return super().get_session_auth_hash()
+
     def save(self, *args, **kwargs):
         if not self.is_superuser:
             self.is_staff = self.role != UserRole.STUDENT
@@ -111,3 +118,71 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class AuditAction(models.TextChoices):
+    REGISTRATION_CREATED = "REGISTRATION_CREATED", "Registration created"
+    REGISTRATION_DELETED = "REGISTRATION_DELETED", "Registration deleted"
+    ROLE_CHANGED = "ROLE_CHANGED", "Role changed"
+    ROSTER_IMPORTED = "ROSTER_IMPORTED", "Roster imported"
+    USERS_MERGED = "USERS_MERGED", "Users merged"
+
+
+class AuditEntry(models.Model):
+    """
+    Append-only audit record.
+
+    Subjects are stored as plain IDs rather than foreign keys so entries
+    outlive (and are never rewritten by) deletes of the rows they describe.
+    """
+
+    action = models.CharField(max_length=32, choices=AuditAction.choices)
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    event_id = models.BigIntegerField(null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["user_id", "created_at"], name="audit_user_history"),
+            models.Index(fields=["event_id", "created_at"], name="audit_event_history"),
+        ]
+        verbose_name_plural = "audit entries"
+
+    def __str__(self):
+        return f"{self.get_action_display()} @ {self.created_at:%Y-%m-%d %H:%M:%S}"
+
+
+class DuplicateStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    MERGED = "MERGED", "Merged"
+    DISMISSED = "DISMISSED", "Dismissed"
+
+
+class DuplicateCandidate(models.Model):
+    """A pair of students that look like the same person, queued for review."""
+
+    # SET_NULL: a merge deletes one of the two users, and the row stays as its record
+    user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, related_name="+")
+    duplicate_of = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, related_name="+")
+    score = models.FloatField()
+    reason = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=16, choices=DuplicateStatus.choices, default=DuplicateStatus.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    resolved_by = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    class Meta:
+        unique_together = ("user", "duplicate_of")
+        ordering = ("-score",)
+
+    def __str__(self):
+        return f"{self.user} ~ {self.duplicate_of} ({self.score:.2f})"
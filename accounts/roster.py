@@ -0,0 +1,110 @@
+"""
+Validation of student roster CSV uploads.
+
+The whole file is checked in one pass against sets of existing register
+numbers, emails and departments loaded up front, so validation costs a
+fixed number of queries however many rows the file has.
+"""
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from .models import Department, User
+
+
+REQUIRED_COLUMNS = ("full_name", "register_number", "email", "department")
+
+
+class RosterReport:
+    def __init__(self):
+        self.total = 0
+        self.rows = []  # valid rows as (line, row) pairs
+        self.errors = []  # (line, register_number, email, message)
+        self.existing = 0  # valid rows matching an existing register number
+        self.new_departments = set()
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    @property
+    def invalid_lines(self):
+        return len({line for line, *_ in self.errors})
+
+    def error_csv(self):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["line", "register_number", "email", "error"])
+        writer.writerows(self.errors)
+        return out.getvalue()
+
+
+def validate_roster(lines):
+    """Validate CSV ``lines`` (an iterable of str) and return a ``RosterReport``."""
+    report = RosterReport()
+    reader = csv.DictReader(lines)
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        report.errors.append((1, "", "", f"Missing column(s): {', '.join(missing)}"))
+        return report
+
+    existing_emails = {}
+    existing_register_numbers = set()
+    for email, register_number in User.objects.values_list("email", "register_number"):
+        existing_emails[email.lower()] = register_number
+        if register_number:
+            existing_register_numbers.add(register_number)
+    departments = set(Department.objects.values_list("name", flat=True))
+
+    seen_register_numbers = {}
+    seen_emails = {}
+
+    for line, row in enumerate(reader, start=2):
+        report.total += 1
+        full_name = (row.get("full_name") or "").strip()
+        register_number = (row.get("register_number") or "").strip()
+        email = (row.get("email") or "").strip()
+        department = (row.get("department") or "").strip()
+        problems = []
+
+        if not full_name:
+            problems.append("Missing full_name")
+
+        if not register_number:
+            problems.append("Missing register_number")
+        elif register_number in seen_register_numbers:
+            problems.append(f"Duplicate register_number (also on line {seen_register_numbers[register_number]})")
+        else:
+            seen_register_numbers[register_number] = line
+
+        if not email:
+            problems.append("Missing email")
+        else:
+            try:
+                validate_email(email)
+            except ValidationError:
+                problems.append("Invalid email")
+            key = email.lower()
+            if key in seen_emails:
+                problems.append(f"Duplicate email (also on line {seen_emails[key]})")
+            else:
+                seen_emails[key] = line
+            if key in existing_emails and existing_emails[key] != register_number:
+                problems.append("Email already belongs to another user")
+
+        if not department:
+            problems.append("Missing department")
+        elif department not in departments:
+            report.new_departments.add(department)
+
+        if problems:
+            report.errors.extend((line, register_number, email, problem) for problem in problems)
+        else:
+            report.rows.append((line, row))
+            if register_number in existing_register_numbers:
+                report.existing += 1
+
+    return report
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from meet import changelog
+from meet.versions import bump
+from .backends import user_cache_key
+from .models import Department, User
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
+    # also after commit, so a concurrent request can't re-cache the old row
+    transaction.on_commit(lambda: cache.delete(user_cache_key(instance.pk)))
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Department)
+def students_changed(sender, update_fields=None, **kwargs):
+    # student rows are rendered in cached report and list fragments;
+    # a login only touches last_login, which none of them show
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    transaction.on_commit(lambda: bump("students"))
+
+
+@receiver(pre_save, sender=User)
+def remember_department(sender, instance, **kwargs):
+    instance._previous_department_id = (
+        User.objects.filter(pk=instance.pk).values_list("department_id", flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=User)
+def department_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and "department" not in update_fields):
+        return
+    previous = getattr(instance, "_previous_department_id", None)
+    if previous != instance.department_id:
+        # sync clients scope registrations by department; move them over
+        changelog.record_department_moves({instance.pk: previous})
+
+
+def users_changed(user_ids):
+    """Invalidate what the signals above would have for ``user_ids`` changed by a bulk ``UPDATE``."""
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    transaction.on_commit(lambda: bump("students"))
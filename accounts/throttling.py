@@ -0,0 +1,180 @@
+"""
+Token-bucket rate limiting shared by plain Django views and DRF.
+
+Each bucket is kept as the single timestamp at which it will be full
+again (the GCRA form of a token bucket), so a check is one O(1) update.
+On Redis that update is a Lua script, which runs atomically, so
+concurrent requests can't all take the same token. With other caches a
+lock makes it atomic within the process, which is all a locmem cache is
+shared by anyway. Limits are
+configured per scope in ``settings.RATE_LIMITS``::
+
+    RATE_LIMITS = {
+        "login": {"ip": "10/min", "user": "5/min"},
+        "register": {"user": "30/min", "roles": {"STUDENT": "10/min"}},
+    }
+
+``user`` limits by user (for login: by the submitted email) and
+``roles`` replaces it for users with that role. ``ip`` limits by client
+address and only applies to requests without a logged-in user: a campus
+NAT puts many students behind one address. Rates are
+``<count>/<sec|min|hour|day>``; the count is also the burst size.
+
+The client address is ``REMOTE_ADDR``. Behind reverse proxies set
+``THROTTLE_NUM_PROXIES`` to how many of them append to
+``X-Forwarded-For``, or every client shares the proxy's address.
+Rejected requests are logged and counted per scope; see
+``throttled_counts``.
+"""
+import functools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.throttling import BaseThrottle
+
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"sec": 1, "min": 60, "hour": 3600, "day": 86400}
+
+# KEYS[1]: bucket; ARGV: seconds per token, seconds to fill the bucket.
+# Returns the seconds to wait as a string (Lua numbers reply as integers).
+TAKE_TOKEN = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local interval, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+local full_at = math.max(tonumber(redis.call("GET", KEYS[1]) or "0"), now) + interval
+local wait = full_at - period - now
+if wait > 0 then
+    return tostring(wait)
+end
+redis.call("SET", KEYS[1], tostring(full_at), "PX", math.ceil((full_at - now) * 1000))
+return "0"
+"""
+
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    count, period = rate.split("/")
+    return int(count), PERIODS[period]
+
+
+def consume(key, rate):
+    """
+    Take one token from bucket ``key``; return seconds to wait, or 0 if allowed.
+    """
+    capacity, period = parse_rate(rate)
+    interval = period / capacity
+    client = getattr(cache, "_cache", None)
+    if hasattr(client, "get_client"):
+        # RedisCache; the script reads Redis's clock so every server agrees on it
+        key = cache.make_and_validate_key(key)
+        return float(client.get_client(key, write=True).eval(TAKE_TOKEN, 1, key, interval, period))
+
+    with _local_lock:
+        now = time.time()
+        full_at = max(cache.get(key, 0), now) + interval
+        wait = full_at - period - now
+        if wait > 0:
+            return wait
+        cache.set(key, full_at, full_at - now)
+        return 0
+
+
+def client_ip(request):
+    proxies = getattr(settings, "THROTTLE_NUM_PROXIES", 0)
+    if proxies:
+        forwarded = [part.strip() for part in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if part.strip()]
+        if forwarded:
+            # the address our nearest trusted proxy saw; anything left of it is client-supplied
+            return forwarded[-min(proxies, len(forwarded))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _buckets(scope, request, user_key=None):
+    limits = getattr(settings, "RATE_LIMITS", {}).get(scope, {})
+    user = getattr(request, "user", None)
+
+    authenticated = user is not None and user.is_authenticated
+    if limits.get("ip") and not authenticated:
+        yield f"ip:{client_ip(request)}", limits["ip"]
+
+    if user_key is None and authenticated:
+        user_key = user.pk
+        rate = limits.get("roles", {}).get(getattr(user, "role", None), limits.get("user"))
+    else:
+        rate = limits.get("user")
+    if rate and user_key is not None:
+        yield f"user:{user_key}", rate
+
+
+def check(scope, request, user_key=None):
+    """Return seconds to wait if ``request`` exceeds any ``scope`` limit, else 0."""
+    wait = 0
+    for ident, rate in _buckets(scope, request, user_key):
+        wait = max(wait, consume(f"throttle:{scope}:{ident}", rate))
+    if wait:
+        _record_throttled(scope, request)
+    return wait
+
+
+def _record_throttled(scope, request):
+    logger.warning(
+        "Throttled %s request from %s (user %s)",
+        scope,
+        client_ip(request),
+        getattr(getattr(request, "user", None), "pk", None),
+    )
+    try:
+        cache.incr(f"throttled:{scope}")
+    except ValueError:
+        cache.add(f"throttled:{scope}", 0, None)
+        cache.incr(f"throttled:{scope}")
+
+
+def throttled_counts():
+    """How many requests each scope has rejected (since the cache was last cleared)."""
+    scopes = getattr(settings, "RATE_LIMITS", {})
+    counts = cache.get_many([f"throttled:{scope}" for scope in scopes])
+    return {scope: counts.get(f"throttled:{scope}", 0) for scope in scopes}
+
+
+def too_many_requests(wait):
+    response = HttpResponse("Too many requests, please slow down.", status=429)
+    response["Retry-After"] = str(int(wait) + 1)
+    return response
+
+
+def rate_limit(scope, methods=None, user_key=None):
+    """
+    View decorator applying ``scope``'s limits.
+
+    ``methods`` restricts limiting to those HTTP methods; ``user_key`` is a
+    ``request -> key`` callable for views where the user is not logged in yet.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if methods is None or request.method in methods:
+                wait = check(scope, request, user_key(request) if user_key else None)
+                if wait:
+                    return too_many_requests(wait)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RateLimitThrottle(BaseThrottle):
+    """DRF throttle using the view's ``throttle_scope`` (default ``"api"``)."""
+
+    def allow_request(self, request, view):
+        self._wait = check(getattr(view, "throttle_scope", "api"), request)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import home, student_bulk_upload, student_search, student_list,add_student_to_event, register_existing_student,  add_new_student_and_register, coordinator_events, event_student_report, faculty_coordinator_dashboard, student_coordinator_dashboard, login_view, logout_view, student_dashboard, student_event_register
+from .views import home, student_bulk_upload, student_bulk_upload_errors, student_search, student_list,add_student_to_event, register_existing_student,  add_new_student_and_register, coordinator_events, event_student_report, event_student_report_rows, faculty_coordinator_dashboard, student_coordinator_dashboard, login_view, logout_view, student_dashboard, student_event_register, registration_feed, participation_dashboard, department_reports, meet_certificates
 
 app_name = "accounts"
 
@@ -7,6 +7,11 @@ urlpatterns = [
     path("", home, name="home"),
     path("students/", student_list, name="student_list"),
     path("students/upload/", student_bulk_upload, name="student_bulk_upload"),
+    path(
+        "students/upload/errors/<str:token>/",
+        student_bulk_upload_errors,
+        name="student_bulk_upload_errors",
+    ),
     path("students/search/", student_search, name="student_search"),
 ]
 urlpatterns += [
@@ -26,11 +31,22 @@ urlpatterns += [
         name="add_new_student_and_register",
     ),
     path("coordinator/events/", coordinator_events, name="coordinator_events"),
+    path("coordinator/feed/", registration_feed, name="registration_feed"),
+    path(
+        "reports/participation/",
+        participation_dashboard,
+        name="participation_dashboard",
+    ),
     path(
         "reports/event-students/",
         event_student_report,
         name="event_student_report",
     ),
+    path(
+        "reports/event-students/<int:event_id>/",
+        event_student_report_rows,
+        name="event_student_report_rows",
+    ),
     path(
         "faculty/dashboard/",
         faculty_coordinator_dashboard,
@@ -41,6 +57,16 @@ urlpatterns += [
         student_coordinator_dashboard,
         name="student_coordinator_dashboard",
     ),
+    path(
+        "reports/departments/<int:meet_id>/",
+        department_reports,
+        name="department_reports",
+    ),
+    path(
+        "reports/certificates/<int:meet_id>/",
+        meet_certificates,
+        name="meet_certificates",
+    ),
     path("login/", login_view, name="login"),
     path("logout/", logout_view, name="logout"),
     path("student/dashboard/",
@@ -1,14 +1,34 @@
-import csv
+import asyncio
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.hashers import make_password
-from django.http import HttpResponseForbidden
-from django.db.models import Q
-
-from .models import User, Department, UserRole
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.db.models import Count, Q
+
+from . import audit
+from .models import AuditAction, User, Department, UserRole
 from .forms import StudentBulkUploadForm, ManualStudentAddForm, LoginForm
-from meet.models import Event, Registration
+from .duplicates import find_roster_duplicates, flag
+from .roster import validate_roster
+from .throttling import rate_limit
+from meet.models import Event, ExportKind, ExportStatus, Meet, Registration
+from meet import intake, notifications
+from meet.analytics import INTERVALS, participation
+from meet.exports import request_export
+from meet.idempotency import idempotent, new_key
+from meet.lookups import active_events, departments
+from meet.feed import feed
+from meet.versions import collection_stamp, generation, generations, latest, make_etag
 
 
 
@@ -33,10 +53,15 @@ def get_user_department(user):
         UserRole.FACULTY_COORDINATOR,
         UserRole.STUDENT_COORDINATOR,
     ):
-        return user.department
+        # the cached map can lag a department created in another process;
+        # a miss must not leave the coordinator unscoped
+        return departments().get(user.department_id) or user.department
     return None
 
 
+ROSTER_ERRORS_TIMEOUT = 60 * 60
+
+
 @login_required
 def student_bulk_upload(request):
     if not is_admin_or_coordinator(request.user):
@@ -49,48 +74,88 @@ def student_bulk_upload(request):
         if form.is_valid():
             csv_file = request.FILES["csv_file"]
             decoded = csv_file.read().decode("utf-8").splitlines()
-            reader = csv.DictReader(decoded)
 
-            for row in reader:
-                department, _ = Department.objects.get_or_create(
-                    name=row["department"]
-                )
+            # validate everything before writing anything
+            report = validate_roster(decoded)
 
-                # Gender
-                gender = row.get("gender", "").strip().upper()
-                if gender not in ("MALE", "FEMALE"):
-                    gender = None
-
-                # Role (default STUDENT)
-                role = row.get("role", "STUDENT").strip().upper()
-                if role not in (
-                    UserRole.STUDENT,
-                    UserRole.STUDENT_COORDINATOR,
-                    UserRole.FACULTY_COORDINATOR,
-                ):
-                    role = UserRole.STUDENT
-
-                student, created = User.objects.get_or_create(
-                    register_number=row["register_number"],
-                    defaults={
-                        "full_name": row["full_name"],
-                        "email": row["email"],
-                        "department": department,
-                        "role": role,
-                        "gender": gender,
-                    }
+            errors_token = None
+            if report.errors:
+                errors_token = uuid.uuid4().hex
+                cache.set(
+                    f"roster-errors:{request.user.id}:{errors_token}",
+                    report.error_csv(),
+                    ROSTER_ERRORS_TIMEOUT,
                 )
 
-                # Update gender if missing
-                if not created and not student.gender and gender:
-                    student.gender = gender
-                    student.save()
+            duplicates = find_roster_duplicates(report.rows) if report.rows else []
+
+            if form.cleaned_data["dry_run"] or not report.is_valid:
+                return render(
+                    request,
+                    "accounts/student_bulk_upload.html",
+                    {"form": form, "report": report, "errors_token": errors_token, "duplicates": duplicates},
+                )
 
-                # Track redirect priority
-                if role == UserRole.FACULTY_COORDINATOR:
-                    redirect_role = UserRole.FACULTY_COORDINATOR
-                elif role == UserRole.STUDENT_COORDINATOR and redirect_role != UserRole.FACULTY_COORDINATOR:
-                    redirect_role = UserRole.STUDENT_COORDINATOR
+            departments = {d.name: d for d in Department.objects.all()}
+            created_count = 0
+
+            with transaction.atomic():
+                for _, row in report.rows:
+                    name = row["department"].strip()
+                    department = departments.get(name)
+                    if department is None:
+                        department = departments[name] = Department.objects.create(name=name)
+
+                    # Gender
+                    gender = (row.get("gender") or "").strip().upper()
+                    if gender not in ("MALE", "FEMALE"):
+                        gender = None
+
+                    # Role (default STUDENT)
+                    role = (row.get("role") or "STUDENT").strip().upper()
+                    if role not in (
+                        UserRole.STUDENT,
+                        UserRole.STUDENT_COORDINATOR,
+                        UserRole.FACULTY_COORDINATOR,
+                    ):
+                        role = UserRole.STUDENT
+
+                    student, created = User.objects.get_or_create(
+                        register_number=row["register_number"].strip(),
+                        defaults={
+                            "full_name": row["full_name"].strip(),
+                            "email": row["email"].strip(),
+                            "department": department,
+                            "role": role,
+                            "gender": gender,
+                        }
+                    )
+
+                    created_count += created
+
+                    # Update gender if missing
+                    if not created and not student.gender and gender:
+                        student.gender = gender
+                        student.save()
+
+                    # Track redirect priority
+                    if role == UserRole.FACULTY_COORDINATOR:
+                        redirect_role = UserRole.FACULTY_COORDINATOR
+                    elif role == UserRole.STUDENT_COORDINATOR and redirect_role != UserRole.FACULTY_COORDINATOR:
+                        redirect_role = UserRole.STUDENT_COORDINATOR
+
+            # possible duplicates are imported anyway and queued for review in the admin
+            flagged = flag(duplicates)
+
+            audit.record(
+                AuditAction.ROSTER_IMPORTED,
+                actor_id=request.user.pk,
+                file=csv_file.name,
+                rows=len(report.rows),
+                created=created_count,
+                new_departments=sorted(report.new_departments),
+                possible_duplicates=flagged,
+            )
 
             # 🔀 FINAL REDIRECT
             if redirect_role == UserRole.FACULTY_COORDINATOR:
@@ -110,6 +175,20 @@ def student_bulk_upload(request):
     )
 
 
+@login_required
+def student_bulk_upload_errors(request, token):
+    if not is_admin_or_coordinator(request.user):
+        return HttpResponseForbidden("Not allowed")
+
+    error_csv = cache.get(f"roster-errors:{request.user.id}:{token}")
+    if error_csv is None:
+        raise Http404("Error report expired")
+
+    response = HttpResponse(error_csv, content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="roster-errors.csv"'
+    return response
+
+
 
 
 
@@ -130,7 +209,7 @@ def student_search(request):
     students = students.filter(
         Q(full_name__icontains=query) |
         Q(register_number__icontains=query)
-    )
+    ).select_related("department")
 
     return render(
         request,
@@ -138,6 +217,8 @@ def student_search(request):
         {
             "students": students,
             "query": query,
+            "department": dept,
+            "students_version": generation("students"),
         }
     )
 
@@ -159,7 +240,11 @@ def student_list(request):
     return render(
         request,
         "accounts/student_list.html",
-        {"students": students},
+        {
+            "students": students.select_related("department"),
+            "department": dept,
+            "students_version": generation("students"),
+        },
     )
 
 
@@ -196,10 +281,13 @@ def add_student_to_event(request, event_id):
             "students": students,
             "query": query,
             "manual_form": manual_form,
+            "idempotency_key": new_key(),
         }
     )
 
 @login_required
+@idempotent
+@rate_limit("register")
 def register_existing_student(request, event_id, student_id):
     if not is_admin_or_coordinator(request.user):
         return HttpResponseForbidden("Not allowed")
@@ -220,11 +308,13 @@ def register_existing_student(request, event_id, student_id):
             return HttpResponseForbidden("Not Allowed")
         
 
-    Registration.objects.get_or_create(
+    registration, created = Registration.objects.get_or_create(
         event=event,
         participant=student,
         defaults={"registered_by": request.user},
     )
+    if created:
+        notifications.registration_confirmed(registration, request.user)
 
     return redirect("accounts:add_student_to_event", event_id=event.id)
 
@@ -232,6 +322,7 @@ def register_existing_student(request, event_id, student_id):
 
 
 @login_required
+@idempotent
 def add_new_student_and_register(request, event_id):
     if not is_admin_or_coordinator(request.user):
         return HttpResponseForbidden("Not allowed")
@@ -257,11 +348,13 @@ def add_new_student_and_register(request, event_id):
             
         student.save()
         
-        Registration.objects.get_or_create(
+        registration, created = Registration.objects.get_or_create(
             event=event,
             participant=student,
             defaults={"registered_by": request.user},
         )
+        if created:
+            notifications.registration_confirmed(registration, request.user)
 
     return redirect("accounts:add_student_to_event", event_id=event.id)
 
@@ -275,10 +368,30 @@ def coordinator_events(request):
     
     events = Event.objects.filter(status="ACTIVE")
     
+    dept = get_user_department(request.user)
+    if dept:
+        events = events.annotate(
+            registration_count=Count("registrations", filter=Q(registrations__participant__department=dept))
+        )
+    else:
+        events = events.annotate(registration_count=Count("registrations"))
+    
     return render(request, "accounts/coordinator_events.html", {"events": events})
 
 
 
+def _report_registrations(event, query):
+    regs = Registration.objects.filter(event=event)
+
+    if query:
+        regs = regs.filter(
+            Q(participant__full_name__icontains=query) |
+            Q(participant__register_number__icontains=query)
+        )
+
+    return regs
+
+
 @login_required
 def event_student_report(request):
     if not is_admin_or_coordinator(request.user):
@@ -286,37 +399,71 @@ def event_student_report(request):
 
     query = request.GET.get("q", "").lower()
 
+    matching = Q()
+    if query:
+        matching = (
+            Q(registrations__participant__full_name__icontains=query) |
+            Q(registrations__participant__register_number__icontains=query)
+        )
+
+    # only counts here; each event's participants are fetched from
+    # event_student_report_rows when the coordinator expands it
     events = Event.objects.filter(
         status="ACTIVE"
-    ).prefetch_related(
-        "registrations__participant"
-    )
+    ).annotate(
+        matches=Count("registrations", filter=matching)
+    ).filter(matches__gt=0)
 
-    result = []
-
-    for event in events:
-        regs = event.registrations.all()
+    return render(
+        request,
+        "accounts/event_student_report.html",
+        {
+            "events": events,
+            "query": query,
+        }
+    )
 
-        if query:
-            regs = [
-                r for r in regs
-                if query in (r.participant.full_name or "").lower()
-                or query in (r.participant.register_number or "").lower()
-            ]
 
+@login_required
+def event_student_report_rows(request, event_id):
+    if not is_admin_or_coordinator(request.user):
+        return HttpResponseForbidden("Not allowed")
 
-        if regs:
-            result.append({
-                "event": event,
-                "registrations": regs,
-            })
+    event = get_object_or_404(Event, id=event_id)
+    query = request.GET.get("q", "").lower()
+    regs = _report_registrations(event, query)
+
+    if request.GET.get("format") == "json":
+        rows = regs.values(
+            "participant__full_name",
+            "participant__register_number",
+            "participant__department__name",
+            "participant__email",
+        )
+        return JsonResponse({
+            "event": event.id,
+            "registrations": [
+                {
+                    "full_name": row["participant__full_name"],
+                    "register_number": row["participant__register_number"],
+                    "department": row["participant__department__name"],
+                    "email": row["participant__email"],
+                }
+                for row in rows
+            ],
+        })
+
+    versions = generations(["students", f"event:{event.id}"])
 
     return render(
         request,
-        "accounts/event_student_report.html",
+        "accounts/_event_registrations.html",
         {
-            "events": result,
+            "event": event,
+            "registrations": regs.select_related("participant__department"),
             "query": query,
+            "version": versions[f"event:{event.id}"],
+            "students_version": versions["students"],
         }
     )
 
@@ -324,6 +471,8 @@ def event_student_report(request):
 
 
 @login_required
+@idempotent
+@rate_limit("register")
 def student_event_register(request, event_id):
     if request.user.role != UserRole.STUDENT:
         return HttpResponseForbidden("Access Denied")
@@ -339,6 +488,10 @@ def student_event_register(request, event_id):
     if request.user.gender == "FEMALE" and event.gender != "GIRLS":
         return HttpResponseForbidden("Not allowed")
 
+    if intake.is_enabled():
+        intake.submit(event, request.user, request.user)
+        return redirect("accounts:student_dashboard")
+
     Registration.objects.get_or_create(
         event=event,
         participant=request.user,
@@ -350,6 +503,128 @@ def student_event_register(request, event_id):
 
 
 
+@login_required
+def department_reports(request, meet_id):
+    if not is_admin_or_coordinator(request.user):
+        return HttpResponseForbidden("Not allowed")
+
+    meet = get_object_or_404(Meet, id=meet_id)
+
+    # coordinators get their own department's sheets only
+    department_id = None
+    if request.user.role != UserRole.ADMIN:
+        department_id = request.user.department_id
+        if department_id is None:
+            return HttpResponseForbidden("No department assigned")
+
+    export = request_export(ExportKind.DEPARTMENT_REPORTS, meet, department_id, request.user)
+    return _export_response(request, export, f"department-reports-meet-{meet.id}.zip")
+
+
+@login_required
+def meet_certificates(request, meet_id):
+    # certificates carry every department's participants, like the admin exports
+    if request.user.role != UserRole.ADMIN:
+        return HttpResponseForbidden("Not allowed")
+
+    meet = get_object_or_404(Meet, id=meet_id)
+    export = request_export(ExportKind.CERTIFICATES, meet, requested_by=request.user)
+    return _export_response(request, export, f"certificates-meet-{meet.id}.zip")
+
+
+def _export_response(request, export, filename):
+    # archives are built by the run_exports worker; until then, ask the browser to come back
+    if export.status == ExportStatus.DONE:
+        return FileResponse(open(export.path, "rb"), as_attachment=True, filename=filename)
+    response = render(request, "accounts/export_pending.html", {"export": export}, status=202)
+    response["Refresh"] = "5"
+    return response
+
+
+@login_required
+def participation_dashboard(request):
+    if not is_admin_or_coordinator(request.user):
+        return HttpResponseForbidden("Not allowed")
+
+    interval = request.GET.get("interval", "day")
+    if interval not in INTERVALS:
+        interval = "day"
+
+    meet_id = request.GET.get("meet") or None
+    if meet_id is not None and not meet_id.isdigit():
+        meet_id = None
+
+    dept = get_user_department(request.user)
+    stats = participation(
+        int(meet_id) if meet_id else None,
+        dept.id if dept else None,
+        interval,
+    )
+    peak = max((row["count"] for row in stats["over_time"]), default=0)
+
+    return render(
+        request,
+        "accounts/participation_dashboard.html",
+        {
+            "stats": stats,
+            "peak": peak,
+            "interval": interval,
+            "meet_id": meet_id,
+            "meets": Meet.objects.order_by("-start_date"),
+            "department": dept,
+        }
+    )
+
+
+
+
+#-------------------------
+#   Live registration feed
+#-------------------------
+
+FEED_HEARTBEAT_SECONDS = 15
+
+
+def _feed_user(request):
+    # resolve the lazy user (and its role) outside the event loop
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+async def registration_feed(request):
+    user = await sync_to_async(_feed_user)(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+    if not is_admin_or_coordinator(user):
+        return HttpResponseForbidden("Not allowed")
+    if "wsgi.version" in request.META:
+        # WSGI would read the endless stream into memory and never answer
+        return HttpResponse("The live feed needs the ASGI server.", status=503)
+
+    scoped = user.role != UserRole.ADMIN
+    subscription = feed.subscribe(scoped, user.department_id)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await subscription.get(FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            feed.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+
+
 #-------------------------
 #   Dashboards
 #-------------------------
@@ -377,7 +652,37 @@ def student_coordinator_dashboard(request):
 
 
 
+def _student_dashboard_stamps(request):
+    # shared by the etag and last-modified callbacks of the same request
+    if not hasattr(request, "_dashboard_stamps"):
+        request._dashboard_stamps = (
+            collection_stamp(Registration.objects.filter(participant=request.user)),
+            collection_stamp(Event.objects.all()),
+            collection_stamp(Meet.objects.all()),
+        )
+    return request._dashboard_stamps
+
+
+def student_dashboard_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return make_etag(
+        request.user.id,
+        request.user.gender,
+        _student_dashboard_stamps(request),
+        sorted(intake.pending_event_ids(request.user.id)) if intake.is_enabled() else None,
+    )
+
+
+def student_dashboard_last_modified(request):
+    if not request.user.is_authenticated:
+        return None
+    return latest(*(last_modified for last_modified, _ in _student_dashboard_stamps(request)))
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=student_dashboard_etag, last_modified_func=student_dashboard_last_modified)
 def student_dashboard(request):
     if request.user.role != UserRole.STUDENT:
         return HttpResponseForbidden("Not allowed")
@@ -387,18 +692,28 @@ def student_dashboard(request):
     
     registered_event_ids = registrations.values_list("event_id", flat=True)
     
+    # queued by the write-behind intake but not flushed yet
+    pending_ids = intake.pending_event_ids(request.user.id) if intake.is_enabled() else set()
+    pending_events = Event.objects.filter(id__in=pending_ids).exclude(id__in=registered_event_ids).select_related("meet") if pending_ids else []
+    
     if request.user.gender == "MALE":
         allowed_gender = "BOYS"
     else:
         allowed_gender = "GIRLS"
         
-    available_events = Event.objects.filter(meet__status="ACTIVE", status="ACTIVE", gender=allowed_gender).exclude(id__in=registered_event_ids).select_related("meet")
+    taken = set(registered_event_ids) | set(pending_ids)
+    available_events = [
+        event for event in active_events()
+        if event.gender == allowed_gender and event.id not in taken
+    ]
     
     
     return render(request, "accounts/dashboards/student_dashboard.html", {
             "student": request.user,
             "registrations": registrations,
-            "available_events": available_events
+            "pending_events": pending_events,
+            "available_events": available_events,
+            "idempotency_key": new_key(),
         }
     )
         
@@ -408,6 +723,11 @@ def student_dashboard(request):
 #   Login and Logout
 #-------------------------
 
+def _login_email(request):
+    return (request.POST.get("email") or "").strip().lower()
+
+
+@rate_limit("login", methods=("POST",), user_key=_login_email)
 def login_view(request):
     if request.user.is_authenticated:
         return redirect("accounts:home")
@@ -1,7 +1,13 @@
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_asgi_application()
+
+# runserver used to serve static files in development; uvicorn does not
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
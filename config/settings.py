@@ -27,18 +27,27 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.audit.AuditActorMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
 
+_TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+if not DEBUG:
+    # compile each template once per process instead of on every render
+    _TEMPLATE_LOADERS = [("django.template.loaders.cached.Loader", _TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": _TEMPLATE_LOADERS,
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
@@ -59,14 +68,59 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "sportsmeet"),
         "HOST": os.environ.get("POSTGRES_HOST", "db"),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        # keep connections open between requests; warmup opens them up front
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# Cache: "redis" (default), "file" or "locmem" (a stand-in for tests and a
+# single process). Bump CACHE_VERSION to invalidate every cached key at once.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "redis")
+
+_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sportsmeet",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", "/tmp/sportsmeet-cache"),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://redis:6379/0"),
+    },
+}
+
+CACHES = {
+    "default": {
+        **_CACHE_BACKENDS[CACHE_BACKEND],
+        "KEY_PREFIX": "sportsmeet",
+        "VERSION": int(os.environ.get("CACHE_VERSION", "1")),
+        "TIMEOUT": int(os.environ.get("CACHE_TIMEOUT", "300")),
     }
 }
 
+# A locmem cache is private to each process: a logout or deactivation in
+# one worker would go unseen by the others, so sessions and the logged-in
+# user are only cached in a shared cache.
+_SHARED_CACHE = CACHE_BACKEND != "locmem"
+
+# "cached_db" reads sessions from the cache and falls back to the DB;
+# "signed_cookies" avoids server-side session storage entirely.
+SESSION_ENGINE = "django.contrib.sessions.backends." + os.environ.get(
+    "SESSION_BACKEND", "cached_db" if _SHARED_CACHE else "db"
+)
+
+# Cached lookup of the logged-in user (see accounts/backends.py); 0 turns it off
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", "300")) if _SHARED_CACHE else 0
+
 
 AUTH_USER_MODEL = "accounts.User"
 
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
+    "accounts.backends.CachedModelBackend",
 ]
 
 LOGIN_URL = "accounts:login"
@@ -87,6 +141,83 @@ USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = "/static/"
+
+# Write-behind intake for student self-registration (see meet/intake.py)
+REGISTRATION_INTAKE_BUFFERED = os.environ.get("REGISTRATION_INTAKE_BUFFERED", "0") == "1"
+REGISTRATION_INTAKE_BATCH_SIZE = int(os.environ.get("REGISTRATION_INTAKE_BATCH_SIZE", "500"))
+REGISTRATION_INTAKE_FLUSH_INTERVAL = float(os.environ.get("REGISTRATION_INTAKE_FLUSH_INTERVAL", "0.2"))
+
+# Registration change feed fan-out: "local" (in-process) or "postgres" (LISTEN/NOTIFY)
+REGISTRATION_FEED_BACKEND = os.environ.get("REGISTRATION_FEED_BACKEND", "local")
+
+# Audit log entries are buffered and written in batches (see accounts/audit.py)
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "1.0"))
+
+# Token-bucket limits per scope (see accounts/throttling.py). Logged-in
+# requests are limited per user only: during the registration rush a
+# whole campus may reach us from one NAT address. ``ip`` limits only
+# apply to anonymous requests.
+RATE_LIMITS = {
+    "login": {"ip": "300/min", "user": "5/min"},
+    "register": {"user": "30/min", "roles": {"STUDENT": "10/min"}},
+    "api": {"ip": "600/min", "user": "300/min", "roles": {"ADMIN": "1200/min"}},
+    # gate volunteers scan in bursts
+    "checkin": {"user": "1200/min"},
+}
+
+# Reverse proxies in front of the app that append to X-Forwarded-For;
+# with 0 the throttles key on REMOTE_ADDR
+THROTTLE_NUM_PROXIES = int(os.environ.get("THROTTLE_NUM_PROXIES", "0"))
+
+# Gate check-ins are written behind the scan in batches
+CHECKIN_BATCH_SIZE = int(os.environ.get("CHECKIN_BATCH_SIZE", "200"))
+CHECKIN_FLUSH_INTERVAL = float(os.environ.get("CHECKIN_FLUSH_INTERVAL", "0.5"))
+
+# Delta sync: how long a committed log row may wait for its publisher before a sync publishes it (see meet/changelog.py)
+SYNC_SETTLE_SECONDS = float(os.environ.get("SYNC_SETTLE_SECONDS", "2"))
+SYNC_PAGE_SIZE = int(os.environ.get("SYNC_PAGE_SIZE", "1000"))
+
+# Email: point EMAIL_BACKEND at the file or locmem backend to keep mail local
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", str(BASE_DIR / "sent_mail"))
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "0") == "1"
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "sportsmeet@localhost")
+
+# Notification outbox: sent in-process in batches; send_notifications handles retries
+NOTIFICATIONS_SEND_IN_PROCESS = os.environ.get("NOTIFICATIONS_SEND_IN_PROCESS", "1") == "1"
+NOTIFICATION_BATCH_SIZE = int(os.environ.get("NOTIFICATION_BATCH_SIZE", "100"))
+NOTIFICATION_FLUSH_INTERVAL = float(os.environ.get("NOTIFICATION_FLUSH_INTERVAL", "1.0"))
+
+# Certificate and department report rendering: worker processes (default one per CPU)
+# and registrations per certificate task
+CERTIFICATE_WORKERS = int(os.environ.get("CERTIFICATE_WORKERS", "0")) or None
+CERTIFICATE_CHUNK_SIZE = int(os.environ.get("CERTIFICATE_CHUNK_SIZE", "250"))
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", "0")) or None
+# Places that get a merit certificate instead of a participation one
+CERTIFICATE_MERIT_PLACES = int(os.environ.get("CERTIFICATE_MERIT_PLACES", "3"))
+
+# Archives built by the run_exports worker, and how long one is served before it is rebuilt
+EXPORT_ROOT = os.environ.get("EXPORT_ROOT", str(BASE_DIR / "exports"))
+EXPORT_MAX_AGE = int(os.environ.get("EXPORT_MAX_AGE", "900"))
+
+# Bib numbers: assign on registration, and how many numbers a process reserves at once
+BIB_AUTO_ASSIGN = os.environ.get("BIB_AUTO_ASSIGN", "1") == "1"
+BIB_BLOCK_SIZE = int(os.environ.get("BIB_BLOCK_SIZE", "100"))
+
+# How long a registration response is replayed for a repeated Idempotency-Key
+IDEMPOTENCY_KEY_TIMEOUT = int(os.environ.get("IDEMPOTENCY_KEY_TIMEOUT", str(60 * 60 * 24)))
+
+REST_FRAMEWORK = {
+    "DEFAULT_THROTTLE_CLASSES": ["accounts.throttling.RateLimitThrottle"],
+}
+
+# Upper bound on how long cached participation analytics may be served
+ANALYTICS_CACHE_TIMEOUT = int(os.environ.get("ANALYTICS_CACHE_TIMEOUT", "300"))
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "accounts.User"
@@ -1,9 +1,11 @@
 from django.urls import path, include
 
 from accounts.admin_site import admin_site
+from meet.views import readiness
 
 urlpatterns = [
     path("admin/", admin_site.urls),
     path("api/", include("meet.urls")),
     path("accounts/", include("accounts.urls")),
+    path("ready/", readiness, name="readiness"),
 ]
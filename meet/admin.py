@@ -1,8 +1,16 @@
-from django.contrib import admin
+import tempfile
+
+from django.contrib import admin, messages
+from django.http import FileResponse, HttpResponseRedirect
+from django.urls import reverse
 
 from accounts.admin import RoleAdminPermissionMixin
+from accounts.models import UserRole
 from accounts.admin_site import admin_site
-from meet.models import Event, Meet, Registration
+from meet.bibs import assign_for_meet
+from meet.models import Bib, Event, Meet, Registration, Result
+from meet.rollover import clone_meet, complete_meets
+from meet.snapshots import SnapshotUnavailable, write_snapshot
 
 
 # class CategoryInline(admin.TabularInline):
@@ -23,6 +31,64 @@ class MeetAdmin(RoleAdminPermissionMixin, admin.ModelAdmin):
     list_filter = ("status", "start_date", "end_date")
     search_fields = ("name",)
     # inlines = (CategoryInline,)
+    actions = (
+        "export_snapshot",
+        "assign_bibs",
+        "download_certificates",
+        "clone_for_next_year",
+        "clone_with_participants",
+        "complete",
+    )
+
+    def has_export_permission(self, request):
+        # exports carry every department's participants, so they're admin-only
+        return self._role(request) == UserRole.ADMIN
+
+    @admin.action(description="Export snapshot (Parquet)", permissions=("export",))
+    def export_snapshot(self, request, queryset):
+        snapshot = tempfile.TemporaryFile()
+        try:
+            write_snapshot(queryset, snapshot)
+        except SnapshotUnavailable as exc:
+            snapshot.close()
+            self.message_user(request, str(exc), messages.ERROR)
+            return None
+        snapshot.seek(0)
+        return FileResponse(snapshot, as_attachment=True, filename="meet-snapshot.parquet")
+
+    @admin.action(description="Download certificates (zip)", permissions=("export",))
+    def download_certificates(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Select a single meet.", messages.ERROR)
+            return None
+        # built by the run_exports worker; the page downloads the zip once it's ready
+        return HttpResponseRedirect(reverse("accounts:meet_certificates", args=[queryset.get().id]))
+
+    @admin.action(description="Assign bib numbers", permissions=("change",))
+    def assign_bibs(self, request, queryset):
+        assigned = sum(assign_for_meet(meet.id) for meet in queryset)
+        self.message_user(request, f"Assigned {assigned} bib numbers.", messages.SUCCESS)
+
+    def _clone(self, request, queryset, reregister):
+        for meet in queryset:
+            clone, events, registrations = clone_meet(meet, reregister=reregister, registered_by=request.user)
+            message = f"Created {clone} ({clone.start_date}) with {events} event(s)"
+            if reregister:
+                message += f" and {registrations} registration(s)"
+            self.message_user(request, message + " as a draft; activate it to open registration.", messages.SUCCESS)
+
+    @admin.action(description="Clone for next year", permissions=("add",))
+    def clone_for_next_year(self, request, queryset):
+        self._clone(request, queryset, reregister=False)
+
+    @admin.action(description="Clone for next year with returning participants", permissions=("add",))
+    def clone_with_participants(self, request, queryset):
+        self._clone(request, queryset, reregister=True)
+
+    @admin.action(description="Close events and complete meet", permissions=("change",))
+    def complete(self, request, queryset):
+        meets, events = complete_meets(queryset.values_list("id", flat=True))
+        self.message_user(request, f"Completed {meets} meet(s) and closed {events} event(s).", messages.SUCCESS)
 
 
 # @admin.register(Category, site=admin_site)
@@ -47,4 +113,30 @@ class EventAdmin(RoleAdminPermissionMixin, admin.ModelAdmin):
     # list_filter = ("status", "event_type", "category__meet")
     # search_fields = ("name", "category__name", "category__meet__name")
 
-admin.site.register(Registration)
\ No newline at end of file
+admin.site.register(Registration)
+
+
+@admin.register(Bib, site=admin_site)
+class BibAdmin(RoleAdminPermissionMixin, admin.ModelAdmin):
+    model_key = "bib"
+
+    list_display = ("number", "participant", "meet")
+    list_filter = ("meet",)
+    search_fields = ("=number", "participant__full_name", "participant__register_number")
+    list_select_related = ("participant", "meet")
+    ordering = ("meet", "number")
+    readonly_fields = ("meet", "participant", "number", "created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Result, site=admin_site)
+class ResultAdmin(RoleAdminPermissionMixin, admin.ModelAdmin):
+    model_key = "result"
+
+    list_display = ("registration", "round", "heat", "place", "mark", "status", "source")
+    list_filter = ("status", "round", "registration__event__meet")
+    search_fields = ("registration__participant__full_name", "registration__participant__register_number", "source")
+    list_select_related = ("registration__participant", "registration__event")
+    raw_id_fields = ("registration",)
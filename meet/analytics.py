@@ -0,0 +1,65 @@
+"""
+Participation breakdowns computed in the database.
+
+Every breakdown is a single ``GROUP BY`` query over registrations. The
+combined result is cached under the current ``registrations`` and
+``events`` generations, so any registration change invalidates it.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDate, TruncHour
+
+from .models import Registration
+from .versions import generation
+
+
+INTERVALS = {"day": TruncDate, "hour": TruncHour}
+
+BREAKDOWNS = {
+    "by_meet": ("event__meet_id", "event__meet__name"),
+    "by_event": ("event_id", "event__name", "event__meet_id"),
+    "by_event_type": ("event__event_type",),
+    "by_department": ("participant__department_id", "participant__department__name"),
+    "by_gender": ("participant__gender",),
+}
+
+
+def _registrations(meet_id=None, department_id=None):
+    registrations = Registration.objects.order_by()
+    if meet_id is not None:
+        registrations = registrations.filter(event__meet_id=meet_id)
+    if department_id is not None:
+        registrations = registrations.filter(participant__department_id=department_id)
+    return registrations
+
+
+def compute_participation(meet_id=None, department_id=None, interval="day"):
+    registrations = _registrations(meet_id, department_id)
+
+    result = {"total": registrations.count()}
+    for name, columns in BREAKDOWNS.items():
+        result[name] = list(
+            registrations.values(*columns).annotate(count=Count("id")).order_by("-count", *columns)
+        )
+
+    bucket = INTERVALS[interval]("created_at")
+    result["over_time"] = [
+        {"bucket": row["bucket"].isoformat(), "count": row["count"]}
+        for row in registrations.annotate(bucket=bucket).values("bucket").annotate(count=Count("id")).order_by("bucket")
+    ]
+    return result
+
+
+def participation(meet_id=None, department_id=None, interval="day"):
+    """Cached ``compute_participation``."""
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}")
+    key = "analytics:participation:{}:{}:{}:{}:{}".format(
+        generation("registrations"), generation("events"), meet_id, department_id, interval
+    )
+    result = cache.get(key)
+    if result is None:
+        result = compute_participation(meet_id, department_id, interval)
+        cache.set(key, result, getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 300))
+    return result
@@ -0,0 +1,87 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    In-process write-behind buffer.
+
+    Items are put on a local queue and a daemon worker hands them to
+    ``flush_fn`` in lists of up to ``batch_size``, waiting at most
+    ``interval`` seconds for a batch to fill up. Whatever is still queued
+    is flushed at interpreter exit.
+    """
+
+    def __init__(self, flush_fn, batch_size=500, interval=0.2, name="batch-writer"):
+        self.flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.interval = interval
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._worker = None
+        atexit.register(self.flush)
+
+    def put(self, item):
+        self._ensure_worker()
+        self._queue.put(item)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Drain everything queued so far on the calling thread."""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _drain(self, block):
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.interval))
+                deadline = time.monotonic() + self.interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch):
+        with self._flush_lock:
+            try:
+                self.flush_fn(batch)
+            except Exception:
+                logger.exception("%s: failed to flush %d items", self.name, len(batch))
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if not batch:
+                continue
+            self._write(batch)
+            close_old_connections()
@@ -0,0 +1,146 @@
+"""
+Bib numbers, one per participant per meet, from hi-lo block sequences.
+
+A process reserves a block of ``BIB_BLOCK_SIZE`` numbers with a single
+``UPDATE`` on the meet's ``BibSequence`` row and then allocates from that
+block in memory. Concurrent workers only meet on the counter row once per
+block; the price is that numbers left in a block when a process exits are
+never used, so bibs are unique but not gap-free.
+
+A block reserved inside a transaction that rolls back is reserved again
+by the next process, so the rest of a block is only kept once the
+reservation has committed, and a bib insert that still collides is
+retried with a fresh block.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Bib, BibSequence, Event, Registration
+from .versions import bump
+
+
+logger = logging.getLogger(__name__)
+
+ASSIGN_ATTEMPTS = 3
+
+def block_size():
+    return getattr(settings, "BIB_BLOCK_SIZE", 100)
+
+
+def reserve_blocks(meet_id, blocks=1):
+    """Reserve ``blocks`` consecutive blocks for ``meet_id``; return the first one."""
+    with transaction.atomic():
+        BibSequence.objects.bulk_create([BibSequence(meet_id=meet_id)], ignore_conflicts=True)
+        # the UPDATE row lock is held until commit, so the read below sees our increment
+        BibSequence.objects.filter(meet_id=meet_id).update(next_block=F("next_block") + blocks)
+        next_block = BibSequence.objects.values_list("next_block", flat=True).get(meet_id=meet_id)
+    return next_block - blocks
+
+
+class BibAllocator:
+    """Hands out numbers from per-meet blocks reserved by this process."""
+
+    def __init__(self, size=None):
+        self.size = size
+        self._ranges = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, meet_id, count=1):
+        size = self.size or block_size()
+        reserved = None
+        with self._lock:
+            start, stop = self._ranges.get(meet_id, (0, 0))
+            numbers = list(range(start, min(stop, start + count)))
+            missing = count - len(numbers)
+            if missing:
+                # large requests take all the blocks they need in one reservation
+                blocks = -(-missing // size)
+                first = reserve_blocks(meet_id, blocks) * size + 1
+                numbers.extend(range(first, first + missing))
+                reserved = (first + missing, first + blocks * size)
+                start = stop
+            else:
+                start += count
+            self._ranges[meet_id] = (start, stop)
+        if reserved:
+            # outside the lock: runs right away when there is no transaction
+            transaction.on_commit(lambda: self._keep(meet_id, reserved))
+        return numbers
+
+    def _keep(self, meet_id, reserved):
+        with self._lock:
+            start, stop = self._ranges.get(meet_id, (0, 0))
+            if start >= stop:
+                self._ranges[meet_id] = reserved
+
+    def discard(self, meet_id):
+        """Forget the rest of ``meet_id``'s block, so the next allocation reserves a new one."""
+        with self._lock:
+            self._ranges.pop(meet_id, None)
+
+
+allocator = BibAllocator()
+
+
+def assign(meet_id, participant_ids, batch_size=2000):
+    """
+    Give each of ``participant_ids`` (in order) a bib for the meet if it has none; return how many were created.
+
+    Raises ``IntegrityError`` if the bibs still collide after
+    ``ASSIGN_ATTEMPTS`` fresh blocks.
+    """
+    for attempt in range(1, ASSIGN_ATTEMPTS + 1):
+        # participants bibbed meanwhile by another process drop out on a retry
+        existing = Bib.objects.filter(meet_id=meet_id)
+        if len(participant_ids) <= batch_size:
+            existing = existing.filter(participant_id__in=participant_ids)
+        existing = set(existing.values_list("participant_id", flat=True))
+        missing = list(dict.fromkeys(pid for pid in participant_ids if pid not in existing))
+        if not missing:
+            return 0
+
+        numbers = allocator.allocate(meet_id, len(missing))
+        try:
+            with transaction.atomic():
+                Bib.objects.bulk_create(
+                    [
+                        Bib(meet_id=meet_id, participant_id=participant_id, number=number)
+                        for participant_id, number in zip(missing, numbers)
+                    ],
+                    batch_size=batch_size,
+                )
+        except IntegrityError:
+            if attempt == ASSIGN_ATTEMPTS:
+                raise
+            logger.warning("Bib numbers for meet %s collided; retrying with a fresh block", meet_id)
+            allocator.discard(meet_id)
+            continue
+        bump(f"bibs:{meet_id}")
+        return len(missing)
+
+
+def assign_for_meet(meet_id):
+    """Bib every registered participant of the meet, ordered by department and name."""
+    rows = (
+        Registration.objects.filter(event__meet_id=meet_id)
+        .order_by("participant__department__name", "participant__full_name", "participant_id")
+        .values_list("participant_id", flat=True)
+    )
+    return assign(meet_id, list(dict.fromkeys(rows.iterator(chunk_size=5000))))
+
+
+def assign_for_registrations(pairs):
+    """Bib newly registered ``(event_id, participant_id)`` pairs."""
+    if not getattr(settings, "BIB_AUTO_ASSIGN", True):
+        return
+    meets = dict(Event.objects.filter(id__in={event_id for event_id, _ in pairs}).values_list("id", "meet_id"))
+    by_meet = {}
+    for event_id, participant_id in pairs:
+        if event_id in meets:
+            by_meet.setdefault(meets[event_id], []).append(participant_id)
+    for meet_id, participant_ids in by_meet.items():
+        assign(meet_id, participant_ids)
@@ -0,0 +1,115 @@
+"""
+Bulk certificate rendering.
+
+Registrations are read with one ``values_list()`` iterator and handed to a
+process pool in chunks of plain dicts, so workers never touch the database.
+Each worker renders its chunk from an SVG template and returns the files,
+which the parent writes into a zip archive in submission order. Only a
+few chunks are in flight at once, so memory stays bounded however big
+the meet is.
+
+Anyone placed within ``CERTIFICATE_MERIT_PLACES`` in their event gets a
+merit certificate instead of a participation one. Placings come from the
+event's final (highest) round: its places if it ran as one heat, else
+the finishers ranked by time across its heats.
+"""
+import os
+import zipfile
+from itertools import groupby
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.template.loader import get_template
+from django.utils.text import slugify
+
+from .models import Bib, Registration, Result, ResultStatus
+from .pool import ordered_map
+
+
+TEMPLATE = "meet/certificates/participation.svg"
+MERIT_TEMPLATE = "meet/certificates/merit.svg"
+
+COLUMNS = (
+    ("registration", "id"),
+    ("name", "participant__full_name"),
+    ("register_number", "participant__register_number"),
+    ("department", "participant__department__name"),
+    ("event", "event__name"),
+    ("gender", "event__gender"),
+    ("meet", "event__meet__name"),
+    ("start_date", "event__meet__start_date"),
+    ("end_date", "event__meet__end_date"),
+    ("bib", "bib"),
+)
+
+
+def final_places(meet):
+    """``{registration_id: place}`` in each event of ``meet``, from its final round."""
+    results = (
+        Result.objects.filter(registration__event__meet=meet, status=ResultStatus.FINISHED)
+        .order_by("registration__event_id", "-round")
+        .values_list("registration__event_id", "round", "heat", "registration_id", "place", "mark_seconds")
+    )
+    places = {}
+    for _, event_results in groupby(results.iterator(chunk_size=5000), key=lambda result: result[0]):
+        event_results = list(event_results)
+        final = [result for result in event_results if result[1] == event_results[0][1]]
+        if len({heat for _, _, heat, _, _, _ in final}) == 1:
+            places.update((registration_id, place) for _, _, _, registration_id, place, _ in final if place)
+            continue
+        timed = sorted((seconds, registration_id) for _, _, _, registration_id, _, seconds in final if seconds)
+        places.update((registration_id, rank) for rank, (_, registration_id) in enumerate(timed, 1))
+    return places
+
+
+def certificate_rows(meet):
+    bib = Bib.objects.filter(meet_id=OuterRef("event__meet_id"), participant_id=OuterRef("participant_id"))
+    rows = (
+        Registration.objects.filter(event__meet=meet)
+        .annotate(bib=Subquery(bib.values("number")[:1]))
+        .order_by("event__name", "participant__full_name", "id")
+        .values_list(*(lookup for _, lookup in COLUMNS))
+    )
+    places = final_places(meet)
+    for row in rows.iterator(chunk_size=2000):
+        row = dict(zip((name for name, _ in COLUMNS), row))
+        row["place"] = places.get(row["registration"])
+        yield row
+
+
+def filename(row):
+    person = slugify(row["name"] or row["register_number"] or "participant")
+    return f"{slugify(row['event'])}/{row['registration']}-{person}.svg"
+
+
+def is_merit(row):
+    return row["place"] is not None and row["place"] <= settings.CERTIFICATE_MERIT_PLACES
+
+
+def render_chunk(rows):
+    participation, merit = get_template(TEMPLATE), get_template(MERIT_TEMPLATE)
+    return [(filename(row), (merit if is_merit(row) else participation).render(row).encode()) for row in rows]
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_certificates(meet, sink, workers=None, chunk_size=None):
+    """Render every registration of ``meet`` into a zip written to ``sink``; return how many."""
+    workers = workers or getattr(settings, "CERTIFICATE_WORKERS", None) or os.cpu_count() or 1
+    chunk_size = chunk_size or getattr(settings, "CERTIFICATE_CHUNK_SIZE", 250)
+    written = 0
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for rendered in ordered_map(render_chunk, _chunks(certificate_rows(meet), chunk_size), workers):
+            for name, content in rendered:
+                archive.writestr(name, content)
+                written += 1
+    return written
@@ -0,0 +1,215 @@
+"""
+Change log and delta sync for coordinator clients.
+
+Every create, change and delete of a meet, event or registration appends
+a ``ChangeLog`` row (from the model signals, or directly by bulk writers
+that bypass them). A client keeps the last ``seq`` it saw as its cursor
+and asks for what happened after it, so a sync costs in proportion to
+the number of changes rather than to the amount of data.
+
+Rows are written in the transaction that makes the change, so they
+commit or roll back with it, but without a ``seq``. Once the transaction
+has committed, ``publish`` numbers its rows under a lock held until the
+numbering commits, so ``seq`` follows commit order and a reader that sees
+one ``seq`` already sees every lower one: a long-running transaction's
+rows get numbers above any cursor handed out while it was open. Rows
+whose publisher never ran (the process died right after the commit) are
+published by the next sync that finds them older than
+``SYNC_SETTLE_SECONDS``.
+
+A first sync pages through a snapshot of everything instead, then
+continues from the snapshot's cursor.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Max, Min, Q
+from django.utils import timezone
+
+from .models import ChangeKind, ChangeLog, Event, Meet, Registration
+from .rows import Unsupported, serialize_rows
+from .serializers import EventSerializer, MeetSerializer, RegistrationSerializer
+
+
+RESOURCES = {
+    ChangeKind.MEET: ("meets", Meet, MeetSerializer),
+    ChangeKind.EVENT: ("events", Event, EventSerializer),
+    ChangeKind.REGISTRATION: ("registrations", Registration, RegistrationSerializer),
+}
+
+
+def record(kind, changes):
+    """
+    Append ``(object_id, deleted, department_id)`` changes of one kind.
+
+    Call it inside the transaction making the changes; they are published
+    once it commits.
+    """
+    rows = ChangeLog.objects.bulk_create([
+        ChangeLog(kind=kind, object_id=object_id, deleted=deleted, department_id=department_id)
+        for object_id, deleted, department_id in changes
+    ])
+    ids = [row.pk for row in rows]
+    if ids:
+        transaction.on_commit(lambda: publish(ids))
+
+
+# key of the advisory lock publishers take turns on
+PUBLISH_LOCK = 0x6368616E67656C6F
+
+
+def publish(ids=None):
+    """
+    Number the committed, unpublished log rows in ``ids`` (or all of them); return how many.
+
+    The lock makes publishers take turns until they commit, so no reader
+    can see a ``seq`` before every lower one is visible too. Other
+    databases serialize writes anyway.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUBLISH_LOCK])
+        rows = ChangeLog.objects.filter(seq__isnull=True)
+        if ids is not None:
+            rows = rows.filter(pk__in=ids)
+        first = rows.aggregate(first=Min("pk"))["first"]
+        if first is None:
+            return 0
+        top = ChangeLog.objects.aggregate(top=Max("seq"))["top"] or 0
+        # keeps id order; the gaps between numbers don't matter
+        return rows.update(seq=F("pk") + (top - first + 1))
+
+
+def _publish_stale():
+    stale = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    if ChangeLog.objects.filter(seq__isnull=True, created_at__lte=stale).exists():
+        publish()
+
+
+def record_registrations(registration_ids):
+    """Log the current state of ``registration_ids``; ids that no longer exist are skipped."""
+    rows = Registration.objects.filter(id__in=registration_ids).values_list("id", "participant__department_id")
+    record(ChangeKind.REGISTRATION, [(pk, False, department_id) for pk, department_id in rows])
+
+
+def record_department_moves(previous):
+    """
+    Log the registrations of participants who changed department.
+
+    ``previous`` maps user ids to the department they left. Each
+    registration is logged for both departments: the new one's clients
+    fetch it, the old one's no longer see it and drop it.
+    """
+    rows = Registration.objects.filter(participant_id__in=previous).values_list(
+        "id", "participant_id", "participant__department_id"
+    )
+    changes = []
+    for pk, participant_id, department_id in rows:
+        changes.append((pk, False, department_id))
+        if previous[participant_id] != department_id:
+            changes.append((pk, False, previous[participant_id]))
+    record(ChangeKind.REGISTRATION, changes)
+
+
+def _visible(queryset, kind, department_id):
+    if kind == ChangeKind.REGISTRATION and department_id is not None:
+        return queryset.filter(participant__department_id=department_id)
+    return queryset
+
+
+def _serialize(queryset, serializer_class):
+    try:
+        return serialize_rows(queryset, serializer_class())
+    except Unsupported:
+        return serializer_class(queryset, many=True).data
+
+
+def _published_log(department_id):
+    _publish_stale()
+    log = ChangeLog.objects.filter(seq__isnull=False)
+    if department_id is not None:
+        log = log.filter(Q(department_id=department_id) | Q(department_id__isnull=True))
+    return log
+
+
+def _page_size(limit):
+    return min(limit, settings.SYNC_PAGE_SIZE) if limit and limit > 0 else settings.SYNC_PAGE_SIZE
+
+
+def _parse_page(page):
+    # "<cursor>.<resource index>.<last pk>"; raises ValueError when malformed
+    cursor, index, after = (int(part) for part in page.split("."))
+    if cursor < 0 or not 0 <= index < len(RESOURCES):
+        raise ValueError(page)
+    return cursor, index, after
+
+
+def snapshot(department_id=None, page=None, limit=None):
+    """
+    Everything visible to the department, ``limit`` objects at a time.
+
+    Meets, then events, then registrations, in ``pk`` order. While ``more``
+    is true, ask again with the returned ``page``; then continue with
+    ``changes_since(cursor)``, which also catches whatever changed while
+    paging. Raises ``ValueError`` for a malformed ``page``.
+    """
+    limit = _page_size(limit)
+    if page:
+        cursor, start, after = _parse_page(page)
+    else:
+        cursor = _published_log(department_id).aggregate(cursor=Max("seq"))["cursor"] or 0
+        start, after = 0, 0
+
+    data = {"cursor": cursor, "more": False, "full": True, "page": None}
+    remaining = limit
+    for index, (kind, (key, model, serializer_class)) in enumerate(RESOURCES.items()):
+        if index < start or remaining == 0:
+            data[key] = []
+            continue
+        queryset = model.objects.filter(pk__gt=after if index == start else 0).order_by("pk")
+        objects = _serialize(_visible(queryset, kind, department_id)[:remaining + 1], serializer_class)
+        more = len(objects) > remaining
+        objects = objects[:remaining]
+        data[key] = objects
+        remaining -= len(objects)
+        if more or (remaining == 0 and index < len(RESOURCES) - 1):
+            data.update(more=True, page=f"{cursor}.{index}.{objects[-1]['id']}")
+            remaining = 0
+    data["deleted"] = {key: [] for key, _, _ in RESOURCES.values()}
+    return data
+
+
+def changes_since(cursor, department_id=None, limit=None):
+    """Objects created, changed or deleted after ``cursor``, at most ``limit`` log rows at a time."""
+    limit = _page_size(limit)
+    rows = list(
+        _published_log(department_id)
+        .filter(seq__gt=cursor)
+        .order_by("seq")
+        .values_list("seq", "kind", "object_id", "deleted")[:limit + 1]
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    # only the latest change per object matters
+    latest = {}
+    for _, kind, object_id, deleted in rows:
+        latest[kind, object_id] = deleted
+
+    data = {"cursor": rows[-1][0] if rows else cursor, "more": more, "full": False, "deleted": {}}
+    for kind, (key, model, serializer_class) in RESOURCES.items():
+        changed = {object_id for (k, object_id), deleted in latest.items() if k == kind and not deleted}
+        objects = _serialize(
+            _visible(model.objects.filter(pk__in=changed).order_by("pk"), kind, department_id),
+            serializer_class,
+        )
+        found = {obj["id"] for obj in objects}
+        data[key] = objects
+        # anything gone (or moved out of the department) since it was logged counts as deleted
+        data["deleted"][key] = sorted(
+            {object_id for (k, object_id), deleted in latest.items() if k == kind and deleted}
+            | (changed - found)
+        )
+    return data
@@ -0,0 +1,291 @@
+"""
+Venue check-in against an in-memory roster per event.
+
+Each process keeps a ``Roster`` per scanned event, indexed separately by
+register number and by bib, since a numeric register number can equal
+someone else's bib. A scan says which it is, by ``kind`` or a ``REG:`` /
+``BIB:`` prefix; a bare code that matches different students in both is
+refused as ambiguous. Before answering a scan the roster compares a handful of
+cache generations (event status, the event's registrations, the meet's
+bibs, the event's check-ins, student records) in one round trip and reloads
+only what moved; registrations are pulled incrementally by ``updated_at``.
+Scans never wait for the database: attendance is queued and written in
+batches, row by row if a batch won't insert.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .batching import BatchWriter
+from .models import Bib, CheckIn, Event, EventStatus, MeetStatus, Registration
+from .versions import bump, generations
+
+
+logger = logging.getLogger(__name__)
+
+CHECKED_IN = "checked_in"
+ALREADY_CHECKED_IN = "already_checked_in"
+NOT_ENTERED = "not_entered"
+EVENT_CLOSED = "event_closed"
+AMBIGUOUS = "ambiguous"
+
+REGISTER_NUMBER = "register_number"
+BIB = "bib"
+KINDS = (REGISTER_NUMBER, BIB)
+PREFIXES = {"REG:": REGISTER_NUMBER, "BIB:": BIB}
+
+
+def normalize(code):
+    return str(code).strip().upper()
+
+
+def normalize_bib(code):
+    code = normalize(code)
+    return str(int(code)) if code.isdigit() else code
+
+
+def parse_code(code, kind=None):
+    """Split a scanned ``code`` into ``(kind, code)``; a prefix overrides ``kind``."""
+    code = normalize(code)
+    for prefix, prefixed_kind in PREFIXES.items():
+        if code.startswith(prefix):
+            return prefixed_kind, code[len(prefix):].strip()
+    return kind, code
+
+
+class Roster:
+    def __init__(self, event_id, meet_id):
+        self.event_id = event_id
+        self.meet_id = meet_id
+        self.active = False
+        self.stamps = {}
+        self.entries = {}  # registration id -> entry
+        self.by_register_number = {}  # normalized register number -> registration id
+        self.by_bib = {}  # normalized bib -> registration id
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+    def scopes(self):
+        return ["events", f"event:{self.event_id}", f"bibs:{self.meet_id}", f"checkins:{self.event_id}", "students"]
+
+    def refresh(self):
+        stamps = generations(self.scopes())
+        if stamps == self.stamps:
+            return
+        with self.lock:
+            changed = {scope for scope, value in stamps.items() if self.stamps.get(scope) != value}
+            # stamps are read before the queries, so a change racing with
+            # them is picked up again on the next scan
+            if "events" in changed:
+                self._load_status()
+            if f"event:{self.event_id}" in changed:
+                self._load_registrations()
+            if "students" in changed and self.stamps:
+                # a name or register number fix doesn't touch the registration
+                self._load_participants()
+            if f"bibs:{self.meet_id}" in changed:
+                self._load_bibs()
+            if f"checkins:{self.event_id}" in changed:
+                self._load_check_ins()
+            self.stamps = stamps
+
+    def _load_status(self):
+        self.active = Event.objects.filter(
+            id=self.event_id, status=EventStatus.ACTIVE, meet__status=MeetStatus.ACTIVE
+        ).exists()
+
+    def _load_registrations(self):
+        registrations = Registration.objects.filter(event_id=self.event_id)
+        current = set(registrations.values_list("id", flat=True))
+        for registration_id in set(self.entries) - current:
+            self._drop(registration_id)
+
+        changed = registrations
+        if self.synced_at is not None:
+            changed = changed.filter(updated_at__gte=self.synced_at)
+        rows = changed.values_list(
+            "id",
+            "participant_id",
+            "participant__full_name",
+            "participant__register_number",
+            "participant__department__name",
+            "updated_at",
+        )
+        added = []
+        for registration_id, participant_id, name, register_number, department, updated_at in rows:
+            previous = self.entries.get(registration_id) or {}
+            self._drop(registration_id)
+            self.entries[registration_id] = {
+                "registration": registration_id,
+                "participant": participant_id,
+                "name": name,
+                "register_number": register_number,
+                "department": department,
+                "bib": None,
+                # a scan may still be queued for the writer
+                "checked_in": previous.get("checked_in", False),
+            }
+            if register_number:
+                self.by_register_number[normalize(register_number)] = registration_id
+            added.append(registration_id)
+            if self.synced_at is None or updated_at > self.synced_at:
+                self.synced_at = updated_at
+
+        if added and self.stamps:
+            self._load_bibs(added)
+            self._load_check_ins(added)
+
+    def _load_participants(self):
+        by_participant = {entry["participant"]: entry for entry in self.entries.values()}
+        rows = Registration.objects.filter(event_id=self.event_id).values_list(
+            "participant_id",
+            "participant__full_name",
+            "participant__register_number",
+            "participant__department__name",
+        )
+        for participant_id, name, register_number, department in rows.iterator():
+            entry = by_participant.get(participant_id)
+            if entry is None:
+                continue
+            previous = entry["register_number"] and normalize(entry["register_number"])
+            if previous and self.by_register_number.get(previous) == entry["registration"]:
+                del self.by_register_number[previous]
+            entry.update(name=name, register_number=register_number, department=department)
+            if register_number:
+                self.by_register_number[normalize(register_number)] = entry["registration"]
+
+    def _drop(self, registration_id):
+        entry = self.entries.pop(registration_id, None)
+        if entry is None:
+            return
+        for index, code in (
+            (self.by_register_number, entry["register_number"] and normalize(entry["register_number"])),
+            (self.by_bib, entry["bib"] is not None and normalize_bib(entry["bib"])),
+        ):
+            if code and index.get(code) == registration_id:
+                del index[code]
+
+    def _load_bibs(self, registration_ids=None):
+        entries = [self.entries[pk] for pk in registration_ids] if registration_ids else list(self.entries.values())
+        by_participant = {entry["participant"]: entry for entry in entries}
+        bibs = Bib.objects.filter(meet_id=self.meet_id)
+        if registration_ids:
+            bibs = bibs.filter(participant_id__in=by_participant)
+        for participant_id, number in bibs.values_list("participant_id", "number").iterator():
+            entry = by_participant.get(participant_id)
+            if entry is not None:
+                if entry["bib"] is not None and self.by_bib.get(normalize_bib(entry["bib"])) == entry["registration"]:
+                    del self.by_bib[normalize_bib(entry["bib"])]
+                entry["bib"] = number
+                self.by_bib[normalize_bib(number)] = entry["registration"]
+
+    def _load_check_ins(self, registration_ids=None):
+        check_ins = CheckIn.objects.filter(registration__event_id=self.event_id)
+        if registration_ids:
+            check_ins = check_ins.filter(registration_id__in=registration_ids)
+        for registration_id in check_ins.values_list("registration_id", flat=True).iterator():
+            entry = self.entries.get(registration_id)
+            if entry is not None:
+                entry["checked_in"] = True
+
+    def lookup(self, code, kind=None):
+        """The entries ``code`` could mean: one, none, or two when a bare code matches both kinds."""
+        kind, code = parse_code(code, kind)
+        found = []
+        if kind in (None, REGISTER_NUMBER):
+            found.append(self.by_register_number.get(code))
+        if kind in (None, BIB):
+            found.append(self.by_bib.get(normalize_bib(code)))
+        return [self.entries[pk] for pk in dict.fromkeys(found) if pk is not None and pk in self.entries]
+
+    def snapshot(self):
+        with self.lock:
+            entries = sorted(self.entries.values(), key=lambda entry: (entry["name"] or "", entry["registration"]))
+            return {
+                "event": self.event_id,
+                "meet": self.meet_id,
+                "active": self.active,
+                "generated_at": timezone.now(),
+                "entries": [dict(entry) for entry in entries],
+            }
+
+
+_rosters = {}
+_rosters_lock = threading.Lock()
+
+
+def roster(event_id):
+    """The refreshed roster for ``event_id``, or None if there is no such event."""
+    found = _rosters.get(event_id)
+    if found is None:
+        meet_id = Event.objects.filter(id=event_id).values_list("meet_id", flat=True).first()
+        if meet_id is None:
+            return None
+        with _rosters_lock:
+            found = _rosters.setdefault(event_id, Roster(event_id, meet_id))
+    found.refresh()
+    return found
+
+
+def scan(event_id, code, checked_in_by_id=None, scanned_at=None, kind=None):
+    """
+    Check ``code`` (a register number or bib, see ``parse_code``) in at the
+    event; return ``(outcome, entry)``, or None for an unknown event.
+    """
+    found = roster(event_id)
+    if found is None:
+        return None
+    if not found.active:
+        return EVENT_CLOSED, None
+
+    with found.lock:
+        entries = found.lookup(code, kind)
+        if not entries:
+            return NOT_ENTERED, None
+        if len(entries) > 1:
+            return AMBIGUOUS, None
+        entry = entries[0]
+        if entry["checked_in"]:
+            return ALREADY_CHECKED_IN, dict(entry)
+        entry["checked_in"] = True
+        entry = dict(entry)
+
+    writer.put((event_id, entry["registration"], checked_in_by_id, scanned_at or timezone.now()))
+    return CHECKED_IN, entry
+
+
+def _write_batch(batch):
+    check_ins = [
+        CheckIn(registration_id=registration_id, checked_in_by_id=user_id, checked_in_at=scanned_at)
+        for _, registration_id, user_id, scanned_at in batch
+    ]
+    try:
+        with transaction.atomic():
+            CheckIn.objects.bulk_create(check_ins, ignore_conflicts=True)
+    except IntegrityError:
+        # one bad row (a registration or scanner deleted meanwhile) would
+        # otherwise lose the whole batch; write them one at a time instead
+        for check_in in check_ins:
+            try:
+                with transaction.atomic():
+                    CheckIn.objects.bulk_create([check_in], ignore_conflicts=True)
+            except IntegrityError as exc:
+                logger.warning(
+                    "Dropped check-in of registration %s by user %s: %s",
+                    check_in.registration_id,
+                    check_in.checked_in_by_id,
+                    exc,
+                )
+    # other processes' rosters pick the check-ins up on their next scan
+    bump(*{f"checkins:{event_id}" for event_id, _, _, _ in batch})
+
+
+writer = BatchWriter(
+    _write_batch,
+    batch_size=getattr(settings, "CHECKIN_BATCH_SIZE", 200),
+    interval=getattr(settings, "CHECKIN_FLUSH_INTERVAL", 0.5),
+    name="check-in",
+)
@@ -0,0 +1,76 @@
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .versions import generations, latest, make_etag
+
+
+def _expanded(serializer_class, shape, prefix=""):
+    # (lookup path, serializer) of every relation ``shape`` nests
+    for relation, child_shape in shape.expand.items():
+        child_class = serializer_class.expandable.get(relation)
+        if child_class is None:
+            continue
+        yield prefix + relation, child_class
+        yield from _expanded(child_class, child_shape, f"{prefix}{relation}__")
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for ModelViewSet ``list`` and ``retrieve``.
+
+    The validators come from an aggregate over the filtered queryset, so a
+    matching ``If-None-Match`` / ``If-Modified-Since`` is answered with
+    304 before the objects are loaded or serialized. With ``?expand=`` the
+    nested objects count too: the same aggregate takes their latest
+    ``updated_at``, or the ETag takes their generation when they have none.
+    """
+
+    def list(self, request, *args, **kwargs):
+        stamp = self._stamp(self.filter_queryset(self.get_queryset()), count=Count("pk"))
+        if stamp is None:
+            return super().list(request, *args, **kwargs)
+        return self._conditional(request, *stamp, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        stamp = self._stamp(self.filter_queryset(self.get_queryset()).filter(**lookup))
+        if stamp is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional(request, *stamp, super().retrieve, *args, **kwargs)
+
+    def _stamp(self, queryset, **aggregates):
+        """``(stamp, last_modified)`` for ``queryset``, or ``None`` if edits to it can't be told."""
+        aggregates["updated_at"] = Max("updated_at")
+        scopes = []
+        shape = self.get_shape() if hasattr(self, "get_shape") else None
+        if shape is not None:
+            for path, serializer_class in _expanded(self.get_serializer_class(), shape):
+                model = serializer_class.Meta.model
+                if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+                    aggregates[path] = Max(f"{path}__updated_at")
+                elif serializer_class.generation_scope:
+                    scopes.append(serializer_class.generation_scope)
+                else:
+                    return None
+        row = queryset.order_by().aggregate(**aggregates)
+        stamp = (sorted(row.items()), sorted(generations(scopes).items()) if scopes else None)
+        return stamp, latest(*(value for key, value in row.items() if key != "count"))
+
+    def _conditional(self, request, stamp, last_modified, view, *args, **kwargs):
+        # representation depends on the query string and negotiated format
+        etag = make_etag(stamp, request.get_full_path(), request.accepted_media_type)
+        # a generation can't be dated, so Last-Modified alone would miss its edits
+        timestamp = last_modified.timestamp() if last_modified and not stamp[1] else None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = view(request, *args, **kwargs)
+
+        if request.method in ("GET", "HEAD") and response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Accept",))
+        return response
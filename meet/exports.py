@@ -0,0 +1,108 @@
+"""
+Certificate and department report archives, built off the request path.
+
+Rendering a whole meet takes a process pool and can run for minutes, so
+web requests never do it: they ask for an ``Export`` and get back the
+latest finished one, or a pending row that the ``run_exports`` worker
+picks up, builds into ``EXPORT_ROOT`` and marks done. An archive is
+served for ``EXPORT_MAX_AGE`` seconds before a request queues a rebuild.
+"""
+import logging
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .certificates import write_certificates
+from .department_reports import write_department_reports
+from .models import Export, ExportKind, ExportStatus
+
+
+logger = logging.getLogger(__name__)
+
+# a build that hasn't finished by then is assumed dead and claimed again
+CLAIM_SECONDS = 3600
+
+
+def request_export(kind, meet, department_id=None, requested_by=None):
+    """The archive to serve for ``kind`` of ``meet``: a fresh finished one, or one queued or being built."""
+    exports = Export.objects.filter(kind=kind, meet=meet, department_id=department_id).order_by("-created_at")
+    fresh = timezone.now() - timedelta(seconds=settings.EXPORT_MAX_AGE)
+    export = exports.filter(status=ExportStatus.DONE, finished_at__gt=fresh).first()
+    if export is None:
+        export = exports.filter(status__in=[ExportStatus.PENDING, ExportStatus.RUNNING]).first()
+    if export is None:
+        export = Export.objects.create(kind=kind, meet=meet, department_id=department_id, requested_by=requested_by)
+    return export
+
+
+def claim():
+    """Take the oldest queued export (or a dead build) for building, or ``None``."""
+    now = timezone.now()
+    with transaction.atomic():
+        export = (
+            Export.objects.filter(
+                Q(status=ExportStatus.PENDING)
+                | Q(status=ExportStatus.RUNNING, started_at__lt=now - timedelta(seconds=CLAIM_SECONDS))
+            )
+            .select_for_update(skip_locked=True)
+            .order_by("created_at")
+            .first()
+        )
+        if export is not None:
+            export.status, export.started_at = ExportStatus.RUNNING, now
+            export.save(update_fields=["status", "started_at"])
+    return export
+
+
+def build(export, workers=None):
+    """Write ``export``'s archive and mark it done (or failed); return it."""
+    root = Path(settings.EXPORT_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    department = f"-department-{export.department_id}" if export.department_id else ""
+    path = root / f"{export.kind.lower()}-meet-{export.meet_id}{department}-{export.pk}.zip"
+    partial = path.with_suffix(".part")
+    try:
+        if export.kind == ExportKind.CERTIFICATES:
+            count = write_certificates(export.meet, partial, workers)
+        else:
+            _, count = write_department_reports(export.meet, partial, export.department_id, workers)
+        os.replace(partial, path)
+    except Exception as exc:
+        logger.exception("Export %s failed", export.pk)
+        partial.unlink(missing_ok=True)
+        export.status, export.error = ExportStatus.FAILED, str(exc)[:1000]
+    else:
+        export.status, export.path, export.count = ExportStatus.DONE, str(path), count
+    export.finished_at = timezone.now()
+    export.save(update_fields=["status", "path", "count", "error", "finished_at"])
+    if export.status == ExportStatus.DONE:
+        _prune(export)
+    return export
+
+
+def _prune(export):
+    # earlier archives of the same kind are superseded
+    older = Export.objects.filter(
+        kind=export.kind,
+        meet_id=export.meet_id,
+        department_id=export.department_id,
+        status__in=[ExportStatus.DONE, ExportStatus.FAILED],
+        created_at__lt=export.created_at,
+    )
+    for path in older.exclude(path="").values_list("path", flat=True):
+        Path(path).unlink(missing_ok=True)
+    older.delete()
+
+
+def run_pending(workers=None):
+    """Build queued exports until none are left; return how many were built."""
+    built = 0
+    while (export := claim()) is not None:
+        build(export, workers)
+        built += 1
+    return built
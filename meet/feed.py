@@ -0,0 +1,184 @@
+"""
+Change feed for registrations.
+
+A single publisher fans registration adds/removes (with the refreshed
+per-department event count) out to every connected Server-Sent Events
+client, so dashboards no longer poll the database themselves.
+
+``REGISTRATION_FEED_BACKEND = "local"`` keeps the fan-out in process.
+``"postgres"`` additionally relays messages through LISTEN/NOTIFY so
+every worker process sees changes made by the others.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+
+from accounts.models import User
+from .models import Registration
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "registration_feed"
+RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+ADDED = "registration.added"
+REMOVED = "registration.removed"
+
+
+class Subscription:
+    """One connected client. ``scoped`` limits it to ``department_id``."""
+
+    def __init__(self, scoped, department_id=None, maxsize=256):
+        self.scoped = scoped
+        self.department_id = department_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def wants(self, message):
+        return not self.scoped or message["department"] == self.department_id
+
+    def _offer(self, message):
+        # slow clients lose the oldest messages rather than blocking the feed
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    def deliver(self, message):
+        if self.wants(message):
+            self.loop.call_soon_threadsafe(self._offer, message)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class RegistrationFeed:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def subscribe(self, scoped, department_id=None):
+        if _backend() == "postgres":
+            self._ensure_listener()
+        subscription = Subscription(scoped, department_id)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def has_subscribers(self):
+        with self._lock:
+            return bool(self._subscribers)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, message):
+        if _backend() == "postgres":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, json.dumps(message)])
+        else:
+            self.dispatch(message)
+
+    def dispatch(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="registration-feed", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        failures = 0
+        while True:
+            raw = None
+            try:
+                # dedicated connection: LISTEN needs autocommit and must outlive requests
+                raw = connection.get_new_connection(connection.get_connection_params())
+                raw.set_session(autocommit=True)
+                with raw.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                failures = 0
+                self._relay(raw)
+            except Exception:
+                # messages sent while reconnecting are lost; clients catch up on their next reload
+                delay = RECONNECT_SECONDS[min(failures, len(RECONNECT_SECONDS) - 1)]
+                failures += 1
+                logger.exception("Registration feed listener failed; reconnecting in %ss", delay)
+                time.sleep(delay)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+    def _relay(self, raw):
+        while True:
+            if select.select([raw], [], [], 5) == ([], [], []):
+                continue
+            raw.poll()
+            while raw.notifies:
+                notify = raw.notifies.pop(0)
+                try:
+                    self.dispatch(json.loads(notify.payload))
+                except ValueError:
+                    logger.warning("Ignoring malformed feed payload: %r", notify.payload)
+
+
+def _backend():
+    return getattr(settings, "REGISTRATION_FEED_BACKEND", "local")
+
+
+def publish_changes(changes):
+    """
+    Publish ``(action, event_id, participant_id)`` changes.
+
+    Uses one query for the participants' departments and one grouped
+    count, however many changes are published together.
+    """
+    if not changes:
+        return
+    if _backend() == "local" and not feed.has_subscribers():
+        # nobody in this process is listening, and nobody else can be
+        return
+
+    participant_ids = {participant_id for _, _, participant_id in changes}
+    departments = dict(User.objects.filter(id__in=participant_ids).values_list("id", "department_id"))
+
+    event_ids = {event_id for _, event_id, _ in changes}
+    counts = {
+        (row["event_id"], row["participant__department_id"]): row["count"]
+        for row in Registration.objects.filter(event_id__in=event_ids)
+        .values("event_id", "participant__department_id")
+        .annotate(count=Count("id"))
+    }
+
+    totals = {}
+    for (event_id, _), count in counts.items():
+        totals[event_id] = totals.get(event_id, 0) + count
+
+    for action, event_id, participant_id in changes:
+        department_id = departments.get(participant_id)
+        feed.publish({
+            "type": action,
+            "event": event_id,
+            "participant": participant_id,
+            "department": department_id,
+            "count": counts.get((event_id, department_id), 0),
+            "total": totals.get(event_id, 0),
+        })
+
+
+feed = RegistrationFeed()
@@ -0,0 +1,137 @@
+"""
+``Idempotency-Key`` support for registration-creating endpoints.
+
+The first request carrying a key runs normally and its response is stored
+in the cache under (user, method, path, key); retries with the same key get
+the stored response back without touching the database. While the first
+request is still running, a concurrent retry gets 409.
+
+API clients send the ``Idempotency-Key`` header. HTML links and forms,
+which cannot set headers, pass an ``idempotency_key`` query or form
+parameter instead (see ``new_key``).
+"""
+import functools
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+
+HEADER = "Idempotency-Key"
+PARAM = "idempotency_key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# how long the first request may run before a retry is allowed through
+LOCK_TIMEOUT = 30
+
+# headers worth replaying; the rest are recomputed by middleware
+KEPT_HEADERS = ("Content-Type", "Location")
+
+
+def new_key():
+    return uuid.uuid4().hex
+
+
+def request_key(request):
+    key = request.headers.get(HEADER) or request.GET.get(PARAM)
+    if not key and request.method == "POST":
+        key = request.POST.get(PARAM)
+    return key or None
+
+
+def _cache_key(request, key):
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return f"idempotency:{request.user.pk}:{request.method}:{request.path}:{digest}"
+
+
+def _storable(response):
+    return response.status_code < 500 and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def run_once(request, key, call, freeze, thaw, conflict):
+    """
+    Run ``call()`` at most once per key.
+
+    ``freeze(response)`` turns a response into something cacheable,
+    ``thaw(frozen)`` rebuilds it for a retry and ``conflict()`` answers a
+    retry that arrives while the first request is still running.
+    """
+    cache_key = _cache_key(request, key)
+
+    frozen = cache.get(cache_key)
+    if frozen is not None:
+        response = thaw(frozen)
+        response[REPLAYED_HEADER] = "true"
+        return response
+
+    lock_key = f"{cache_key}:lock"
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return conflict()
+
+    try:
+        response = call()
+        if _storable(response):
+            cache.set(cache_key, freeze(response), settings.IDEMPOTENCY_KEY_TIMEOUT)
+        return response
+    finally:
+        cache.delete(lock_key)
+
+
+def _kept_headers(response):
+    return {name: response[name] for name in KEPT_HEADERS if response.has_header(name)}
+
+
+def _freeze_http(response):
+    return response.status_code, response.content, _kept_headers(response)
+
+
+def _thaw_http(frozen):
+    status_code, content, headers = frozen
+    return HttpResponse(content, status=status_code, headers=headers)
+
+
+def _conflict_http():
+    return HttpResponse("This request is already being processed.", status=409)
+
+
+def idempotent(view):
+    """View decorator for plain Django views; a no-op for requests without a key."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request_key(request)
+        if key is None:
+            return view(request, *args, **kwargs)
+        return run_once(
+            request,
+            key,
+            lambda: view(request, *args, **kwargs),
+            _freeze_http,
+            _thaw_http,
+            _conflict_http,
+        )
+    return wrapper
+
+
+class IdempotentCreateMixin:
+    """Makes a DRF viewset's ``create`` honour ``Idempotency-Key``."""
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+
+        return run_once(
+            request,
+            key,
+            lambda: super(IdempotentCreateMixin, self).create(request, *args, **kwargs),
+            lambda response: (response.status_code, response.data, _kept_headers(response)),
+            lambda frozen: Response(frozen[1], status=frozen[0], headers=frozen[2]),
+            lambda: Response(
+                {"detail": "This request is already being processed."},
+                status=status.HTTP_409_CONFLICT,
+            ),
+        )
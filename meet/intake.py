@@ -0,0 +1,137 @@
+"""
+Optional write-behind intake for student self-registration.
+
+With ``REGISTRATION_INTAKE_BUFFERED`` enabled, ``student_event_register``
+validates the request and stages it as a ``PendingRegistration`` row
+instead of running its own ``get_or_create``: one plain insert, with no
+signals, change log, feed or audit work on the request path. Until the
+row is drained the registration is reported to the student as pending,
+by whichever worker serves them.
+
+Once the insert commits, an in-process ``BatchWriter`` is woken to drain
+the table: it claims staged rows in batches, inserts the registrations
+that don't exist yet and deletes them in the same transaction. Only the
+rows its own insert created are logged, published and audited. Rows a killed process never got to are
+drained with the next batch, or by ``flush_registration_intake``.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts import audit
+from accounts.models import AuditAction
+from . import changelog
+from .batching import BatchWriter
+from .feed import ADDED
+from .models import PendingRegistration, Registration
+from .signals import registrations_changed
+
+
+def is_enabled():
+    return getattr(settings, "REGISTRATION_INTAKE_BUFFERED", False)
+
+
+def submit(event, participant, registered_by):
+    PendingRegistration.objects.bulk_create(
+        [PendingRegistration(event=event, participant=participant, registered_by=registered_by)],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(lambda: writer.put((event.id, participant.id)))
+
+
+def pending_event_ids(participant_id):
+    return set(PendingRegistration.objects.filter(participant_id=participant_id).values_list("event_id", flat=True))
+
+
+def pending_count():
+    return PendingRegistration.objects.count()
+
+
+def drain(limit):
+    """
+    Register up to ``limit`` staged rows and remove them; return how many were taken.
+
+    Rows another process is draining are skipped rather than waited on.
+    """
+    with transaction.atomic():
+        staged = list(
+            PendingRegistration.objects.select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", "event_id", "participant_id", "registered_by_id")[:limit]
+        )
+        if not staged:
+            return 0
+
+        created = _insert_new(staged)
+        # the INSERT skips post_save, so log and notify directly
+        changelog.record_registrations([pk for pk, _, _ in created])
+        registered_by = {(event_id, participant_id): by for _, event_id, participant_id, by in staged}
+        new = {(event_id, participant_id): registered_by[event_id, participant_id] for _, event_id, participant_id in created}
+        PendingRegistration.objects.filter(pk__in=[pk for pk, *_ in staged]).delete()
+        transaction.on_commit(lambda: _registered(new))
+    return len(staged)
+
+
+def _insert_new(staged):
+    """
+    Insert registrations for ``staged`` rows; return ``(id, event_id, participant_id)`` of those really created.
+
+    Rows that already exist, also ones another drainer or the synchronous
+    path inserts concurrently, are skipped by ``ON CONFLICT DO NOTHING``
+    and left out of ``RETURNING``, so they aren't logged or published twice.
+    """
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    quote = connection.ops.quote_name
+    columns = ("event_id", "participant_id", "registered_by_id", "created_at", "updated_at")
+    sql = (
+        f"INSERT INTO {quote(Registration._meta.db_table)} ({', '.join(map(quote, columns))}) VALUES "
+        + ", ".join(["(%s, %s, %s, %s, %s)"] * len(staged))
+        + f" ON CONFLICT DO NOTHING RETURNING {quote('id')}, {quote('event_id')}, {quote('participant_id')}"
+    )
+    params = [
+        value
+        for _, event_id, participant_id, registered_by_id in staged
+        for value in (event_id, participant_id, registered_by_id, now, now)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def drain_all(batch_size=None):
+    """Drain the staged rows batch by batch until none are left; return how many were taken."""
+    batch_size = batch_size or writer.batch_size
+    drained = 0
+    while True:
+        taken = drain(batch_size)
+        if not taken:
+            return drained
+        drained += taken
+
+
+def _registered(new):
+    registrations_changed(
+        [event_id for event_id, _ in new],
+        [(ADDED, event_id, participant_id) for event_id, participant_id in new],
+    )
+    for (event_id, participant_id), registered_by_id in new.items():
+        audit.record(
+            AuditAction.REGISTRATION_CREATED,
+            actor_id=registered_by_id,
+            user_id=participant_id,
+            event_id=event_id,
+            source="intake",
+        )
+
+
+def _write_batch(batch):
+    # the queued items only wake the writer up; the staged rows are the queue
+    drain_all()
+
+
+writer = BatchWriter(
+    _write_batch,
+    batch_size=getattr(settings, "REGISTRATION_INTAKE_BATCH_SIZE", 500),
+    interval=getattr(settings, "REGISTRATION_INTAKE_FLUSH_INTERVAL", 0.2),
+    name="registration-intake",
+)
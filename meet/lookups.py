@@ -0,0 +1,39 @@
+"""
+Small, hot lookups served from the cache.
+
+Entries are keyed on the generation of the data they depend on, so a
+signal-driven bump (see meet/signals.py and accounts/signals.py) retires
+them without explicit deletes.
+"""
+from django.core.cache import cache
+
+from accounts.models import Department
+from .models import Event, EventStatus, MeetStatus
+from .versions import generation
+
+
+LOOKUP_TIMEOUT = 60 * 60
+
+
+def active_events():
+    """Open events of active meets, with their meet loaded."""
+    key = f"lookups:active-events:{generation('events')}"
+    return cache.get_or_set(
+        key,
+        lambda: list(
+            Event.objects.filter(status=EventStatus.ACTIVE, meet__status=MeetStatus.ACTIVE)
+            .select_related("meet")
+            .order_by("meet__start_date", "name")
+        ),
+        LOOKUP_TIMEOUT,
+    )
+
+
+def departments():
+    """``{id: Department}`` for every department."""
+    key = f"lookups:departments:{generation('students')}"
+    return cache.get_or_set(
+        key,
+        lambda: {department.id: department for department in Department.objects.all()},
+        LOOKUP_TIMEOUT,
+    )
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meet.bibs import assign_for_meet
+from meet.models import Meet, MeetStatus
+
+
+class Command(BaseCommand):
+    help = "Give every registered participant of a meet a bib number."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "meets",
+            nargs="*",
+            type=int,
+            help="Meet ids (default: every active meet).",
+        )
+
+    def handle(self, *args, **options):
+        meets = Meet.objects.all()
+        if options["meets"]:
+            meets = meets.filter(id__in=options["meets"])
+            if meets.count() != len(set(options["meets"])):
+                raise CommandError("Unknown meet id")
+        else:
+            meets = meets.filter(status=MeetStatus.ACTIVE)
+
+        for meet in meets:
+            started = time.perf_counter()
+            assigned = assign_for_meet(meet.id)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"{meet.name}: assigned {assigned} bibs in {elapsed:.2f} s"
+                f" ({assigned / elapsed if elapsed else 0:,.0f}/s)"
+            ))
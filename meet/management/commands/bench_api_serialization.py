@@ -0,0 +1,66 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User, UserRole
+from meet.models import Event, Meet, MeetStatus, Registration
+from meet.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from meet.rows import serialize_rows
+from meet.serializers import RegistrationSerializer, Shape
+
+
+class Command(BaseCommand):
+    help = "Time serializing and rendering registration lists, per 10k rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        meet = Meet.objects.create(name="bench-serialization", start_date=date.today(), end_date=date.today(), status=MeetStatus.ACTIVE)
+        try:
+            event = Event.objects.create(meet=meet, name="bench-event")
+            students = User.objects.bulk_create(
+                [
+                    User(email=f"bench-serial-{i}@example.invalid", register_number=f"bench-serial-{i}", role=UserRole.STUDENT)
+                    for i in range(rows)
+                ]
+            )
+            Registration.objects.bulk_create([Registration(event=event, participant=s) for s in students])
+            queryset = Registration.objects.filter(event=event)
+
+            expanded = Shape.from_query_params({"expand": "event.meet,participant"})
+            cases = [
+                ("ModelSerializer", lambda: RegistrationSerializer(queryset, many=True).data),
+                ("rows", lambda: serialize_rows(queryset, RegistrationSerializer())),
+                ("ModelSerializer+expand", lambda: RegistrationSerializer(queryset.select_related("event__meet", "participant"), many=True, shape=expanded).data),
+                ("rows+expand", lambda: serialize_rows(queryset, RegistrationSerializer(shape=expanded))),
+            ]
+            renderers = [("json (stdlib)", JSONRenderer())]
+            if orjson is not None:
+                renderers.append(("json (orjson)", FastJSONRenderer()))
+            if msgpack is not None:
+                renderers.append(("msgpack", MessagePackRenderer()))
+
+            scale = 10000 / rows
+            for label, build in cases:
+                elapsed, data = self._best(build, options["repeat"])
+                self.stdout.write(f"{label:>24}: {elapsed * scale * 1000:8.1f} ms / 10k rows")
+                for name, renderer in renderers:
+                    render_elapsed, _ = self._best(lambda: renderer.render(data), options["repeat"])
+                    self.stdout.write(f"{'+ ' + name:>24}: {render_elapsed * scale * 1000:8.1f} ms / 10k rows")
+        finally:
+            User.objects.filter(email__startswith="bench-serial-").delete()
+            meet.delete()
+
+    def _best(self, fn, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from accounts.models import User, UserRole
+from meet import intake
+from meet.models import Event, Meet, MeetStatus, Registration
+
+
+def _p99(samples):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+class Command(BaseCommand):
+    help = "Simulate a registration rush and compare the synchronous path with the write-behind intake."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=2000)
+        parser.add_argument("--events", type=int, default=5)
+        parser.add_argument("--workers", type=int, default=16)
+
+    def handle(self, *args, **options):
+        meet = Meet.objects.create(
+            name="bench-intake",
+            start_date=date.today(),
+            end_date=date.today(),
+            status=MeetStatus.ACTIVE,
+        )
+        try:
+            events = Event.objects.bulk_create(
+                [Event(meet=meet, name=f"bench-event-{i}") for i in range(options["events"])]
+            )
+            students = User.objects.bulk_create(
+                [
+                    User(email=f"bench-intake-{i}@example.invalid", register_number=f"bench-intake-{i}", role=UserRole.STUDENT)
+                    for i in range(options["students"])
+                ]
+            )
+            jobs = [(events[i % len(events)], student) for i, student in enumerate(students)]
+
+            self._report("sync", self._run_sync(jobs, options["workers"]), len(jobs))
+            Registration.objects.filter(event__meet=meet).delete()
+            self._report("buffered", self._run_buffered(jobs, options["workers"]), len(jobs))
+        finally:
+            User.objects.filter(email__startswith="bench-intake-").delete()
+            meet.delete()
+
+    def _timed(self, fn):
+        def call(job):
+            started = time.perf_counter()
+            fn(*job)
+            return time.perf_counter() - started
+        return call
+
+    def _run_pool(self, fn, jobs, workers):
+        def call(job):
+            try:
+                return fn(job)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(call, jobs))
+
+    def _run_sync(self, jobs, workers):
+        def register(event, student):
+            Registration.objects.get_or_create(event=event, participant=student, defaults={"registered_by": student})
+
+        started = time.perf_counter()
+        latencies = self._run_pool(self._timed(register), jobs, workers)
+        return latencies, time.perf_counter() - started
+
+    def _run_buffered(self, jobs, workers):
+        def register(event, student):
+            intake.submit(event, student, student)
+
+        started = time.perf_counter()
+        latencies = self._run_pool(self._timed(register), jobs, workers)
+        intake.writer.flush()
+        while intake.pending_count():
+            time.sleep(0.005)
+        return latencies, time.perf_counter() - started
+
+    def _report(self, label, result, count):
+        latencies, elapsed = result
+        self.stdout.write(
+            f"{label:>8}: {count / elapsed:,.0f} registrations/s, "
+            f"p99 {_p99(latencies) * 1000:.2f} ms, total {elapsed:.2f} s"
+        )
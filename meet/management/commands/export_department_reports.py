@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meet.department_reports import write_department_reports
+from meet.models import Meet
+
+
+class Command(BaseCommand):
+    help = "Write every department's registration sheets (CSV and printable HTML) for a meet into one zip."
+
+    def add_arguments(self, parser):
+        parser.add_argument("meet_id", type=int)
+        parser.add_argument("--output", "-o", required=True)
+        parser.add_argument("--department", type=int, help="Only this department id.")
+        parser.add_argument("--workers", type=int, help="Worker processes (default: REPORT_WORKERS or one per CPU).")
+
+    def handle(self, *args, **options):
+        meet = Meet.objects.filter(id=options["meet_id"]).first()
+        if meet is None:
+            raise CommandError(f"Unknown meet id: {options['meet_id']}")
+
+        started = time.perf_counter()
+        departments, rows = write_department_reports(
+            meet, options["output"], options["department"], options["workers"]
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote reports for {departments} department(s), {rows} registrations,"
+            f" to {options['output']} in {elapsed:.2f} s"
+        ))
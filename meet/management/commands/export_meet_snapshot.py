@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meet.models import Meet
+from meet.snapshots import FORMATS, SnapshotUnavailable, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write a columnar (Parquet / Arrow IPC) snapshot of one or more meets."
+
+    def add_arguments(self, parser):
+        parser.add_argument("meet_ids", nargs="+", type=int)
+        parser.add_argument("--output", "-o", required=True)
+        parser.add_argument("--format", choices=FORMATS, default="parquet")
+        parser.add_argument("--batch-size", type=int, default=50000)
+
+    def handle(self, *args, **options):
+        meets = Meet.objects.filter(id__in=options["meet_ids"])
+        missing = set(options["meet_ids"]) - set(meets.values_list("id", flat=True))
+        if missing:
+            raise CommandError(f"Unknown meet id(s): {', '.join(map(str, sorted(missing)))}")
+
+        started = time.perf_counter()
+        try:
+            rows = write_snapshot(meets, options["output"], options["format"], options["batch_size"])
+        except SnapshotUnavailable as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {rows} rows to {options['output']} in {elapsed:.2f} s"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from meet import intake
+
+
+class Command(BaseCommand):
+    help = "Register every self-registration still staged by the write-behind intake."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Rows per transaction (default REGISTRATION_INTAKE_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        drained = intake.drain_all(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Registered {drained} staged registration(s)"))
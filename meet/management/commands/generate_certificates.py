@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meet.certificates import write_certificates
+from meet.models import Meet, MeetStatus
+
+
+class Command(BaseCommand):
+    help = "Render a participation certificate (SVG) for every registration of a meet into a zip archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("meet_id", type=int)
+        parser.add_argument("--output", "-o", required=True)
+        parser.add_argument("--workers", type=int, help="Worker processes (default: CERTIFICATE_WORKERS or one per CPU).")
+        parser.add_argument("--chunk-size", type=int, help="Registrations per worker task.")
+
+    def handle(self, *args, **options):
+        meet = Meet.objects.filter(id=options["meet_id"]).first()
+        if meet is None:
+            raise CommandError(f"Unknown meet id: {options['meet_id']}")
+        if meet.status != MeetStatus.COMPLETED:
+            self.stderr.write(self.style.WARNING(f"{meet.name} is not completed yet"))
+
+        started = time.perf_counter()
+        written = write_certificates(meet, options["output"], options["workers"], options["chunk_size"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} certificates to {options['output']} in {elapsed:.2f} s"
+            f" ({written / elapsed if elapsed else 0:,.0f}/s)"
+        ))
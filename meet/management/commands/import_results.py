@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from meet.models import Meet
+from meet.results import ResultIndex, import_file
+
+
+class Command(BaseCommand):
+    help = "Import timing-system result files (.lif / .csv) for a meet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("meet_id", type=int)
+        parser.add_argument("files", nargs="+")
+
+    def handle(self, *args, **options):
+        if not Meet.objects.filter(id=options["meet_id"]).exists():
+            raise CommandError(f"Unknown meet id: {options['meet_id']}")
+
+        index = ResultIndex(options["meet_id"])
+        for path in options["files"]:
+            report = import_file(path, index)
+            style = self.style.ERROR if report.error else self.style.SUCCESS
+            self.stdout.write(style(str(report)))
+            for event, code in report.unmatched[:20]:
+                self.stdout.write(f"  unmatched: {event} / {code}")
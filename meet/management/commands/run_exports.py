@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from meet.exports import run_pending
+
+
+class Command(BaseCommand):
+    help = "Build the certificate and department report archives requested from the web."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Build what is queued now and exit.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls when not --once.")
+        parser.add_argument("--workers", type=int, help="Worker processes per archive (default: the renderer's).")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            built = run_pending(options["workers"])
+            if built or options["once"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Built {built} export(s) in {time.perf_counter() - started:.2f} s"
+                ))
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from meet.notifications import send_due
+
+
+class Command(BaseCommand):
+    help = "Send queued notification emails that are due, including retries of failed ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Send what is due now and exit.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls when not --once.")
+        parser.add_argument("--batch-size", type=int, help="Messages per connection (default NOTIFICATION_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, attempted, elapsed = send_due(options["batch_size"])
+            if attempted or options["once"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {sent}/{attempted} notifications in {elapsed:.2f} s"
+                    f" ({sent / elapsed if elapsed else 0:,.0f} msg/s)"
+                ))
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
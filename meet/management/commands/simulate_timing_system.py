@@ -0,0 +1,63 @@
+import random
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import OuterRef, Subquery
+
+from meet.models import Bib, Event, Registration
+
+
+class Command(BaseCommand):
+    help = (
+        "Stand-in for a venue timing system: writes FinishLynx-style .lif heat "
+        "results for a meet's events into a drop folder."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("meet_id", type=int)
+        parser.add_argument("folder")
+        parser.add_argument("--heat-size", type=int, default=8)
+        parser.add_argument("--delay", type=float, default=0.0, help="Seconds between files.")
+        parser.add_argument("--unknown", type=float, default=0.02, help="Share of rows with a bib nobody has.")
+        parser.add_argument("--seed", type=int)
+
+    def handle(self, *args, **options):
+        folder = Path(options["folder"])
+        if not folder.is_dir():
+            raise CommandError(f"No such folder: {folder}")
+        rng = random.Random(options["seed"])
+
+        bib = Bib.objects.filter(meet_id=OuterRef("event__meet_id"), participant_id=OuterRef("participant_id"))
+        files = rows = 0
+        for event in Event.objects.filter(meet_id=options["meet_id"]).order_by("id"):
+            entrants = list(
+                Registration.objects.filter(event=event)
+                .annotate(bib=Subquery(bib.values("number")[:1]))
+                .values_list("bib", "participant__register_number", "participant__full_name")
+            )
+            rng.shuffle(entrants)
+            for heat, start in enumerate(range(0, len(entrants), options["heat_size"]), start=1):
+                lines = [f"{event.id},1,{heat},{event.name},+0.0,m/s"]
+                marks = sorted(rng.uniform(10.5, 16.0) for _ in entrants[start:start + options["heat_size"]])
+                for lane, ((number, register_number, name), mark) in enumerate(
+                    zip(entrants[start:start + options["heat_size"]], marks), start=1
+                ):
+                    code = number if number is not None else f"REG:{register_number}"
+                    if rng.random() < options["unknown"]:
+                        code = 999999
+                    place, time_text = (lane, f"{mark:.2f}") if rng.random() > 0.05 else ("DNF", "")
+                    last, _, first = (name or "").partition(" ")
+                    lines.append(f"{place},{code},{lane},{last},{first},,{time_text}")
+
+                # write then rename, as timing software does, so the watcher never sees half a file
+                target = folder / f"event{event.id}-heat{heat}.lif"
+                partial = folder / f".{target.name}.part"
+                partial.write_text("\n".join(lines) + "\n")
+                partial.rename(target)
+                files += 1
+                rows += len(lines) - 1
+                if options["delay"]:
+                    time.sleep(options["delay"])
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {files} result files ({rows} rows) to {folder}"))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from accounts.models import Department
+from meet.analytics import INTERVALS, participation
+from meet.models import Meet
+from meet.versions import generation
+
+
+class Command(BaseCommand):
+    help = "Pre-fill the hot cache entries after a deploy."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        cache.get("warm_cache:ping")  # fail early if the cache is unreachable
+
+        generation("registrations")
+        generation("events")
+
+        department_ids = [None, *Department.objects.values_list("id", flat=True)]
+        meet_ids = [None, *Meet.objects.exclude(status="DRAFT").values_list("id", flat=True)]
+        warmed = 0
+        for meet_id in meet_ids:
+            for department_id in department_ids:
+                for interval in INTERVALS:
+                    participation(meet_id, department_id, interval)
+                    warmed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {warmed} analytics entries in {time.perf_counter() - started:.2f} s"
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from meet import warmup
+
+
+class Command(BaseCommand):
+    help = "Import URLconfs, compile templates, open connections and fill hot caches after a deploy."
+    # system checks would import the URLconfs before the "urls" step could time them
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-analytics",
+            action="store_true",
+            help="Do not pre-compute participation analytics (see warm_cache).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        for name, count, seconds in warmup.run():
+            self.stdout.write(f"{name:<10} {count:>6}  {seconds * 1000:8.1f} ms")
+
+        if not options["skip_analytics"]:
+            call_command("warm_cache", stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Warm-up finished in {time.perf_counter() - started:.2f} s"
+        ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meet.models import Meet
+from meet.results import watch
+
+
+class Command(BaseCommand):
+    help = "Watch a drop folder and import timing-system result files for a meet as they land."
+
+    def add_arguments(self, parser):
+        parser.add_argument("meet_id", type=int)
+        parser.add_argument("folder")
+        parser.add_argument("--interval", type=float, default=0.25, help="Seconds between polls.")
+
+    def handle(self, *args, **options):
+        if not Meet.objects.filter(id=options["meet_id"]).exists():
+            raise CommandError(f"Unknown meet id: {options['meet_id']}")
+
+        self.stdout.write(f"Watching {options['folder']} (Ctrl+C to stop)")
+        try:
+            for report in watch(options["folder"], options["meet_id"], options["interval"]):
+                style = self.style.ERROR if report.error else self.style.SUCCESS
+                self.stdout.write(style(f"{time.strftime('%H:%M:%S')} {report}"))
+        except KeyboardInterrupt:
+            pass
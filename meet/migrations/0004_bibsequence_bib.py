@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('meet', '0003_event_updated_at_meet_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BibSequence',
+            fields=[
+                ('meet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='bib_sequence', serialize=False, to='meet.meet')),
+                ('next_block', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Bib',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('meet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bibs', to='meet.meet')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bibs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('meet', 'number'), ('meet', 'participant')},
+            },
+        ),
+    ]
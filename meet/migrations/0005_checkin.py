@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('meet', '0004_bibsequence_bib'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckIn',
+            fields=[
+                ('registration', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='check_in', serialize=False, to='meet.registration')),
+                ('checked_in_at', models.DateTimeField()),
+                ('checked_in_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='check_ins_done', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
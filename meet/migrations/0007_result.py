@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0006_changelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Result',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round', models.PositiveSmallIntegerField(default=1)),
+                ('heat', models.PositiveSmallIntegerField(default=1)),
+                ('place', models.PositiveIntegerField(blank=True, null=True)),
+                ('mark', models.CharField(blank=True, max_length=32)),
+                ('mark_seconds', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('FINISHED', 'Finished'), ('DNF', 'Did not finish'), ('DNS', 'Did not start'), ('DQ', 'Disqualified')], default='FINISHED', max_length=16)),
+                ('source', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('registration', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='meet.registration')),
+            ],
+            options={
+                'unique_together': {('registration', 'round')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def number_existing(apps, schema_editor):
+    ChangeLog = apps.get_model("meet", "ChangeLog")
+    ChangeLog.objects.update(seq=F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0009_pendingregistration'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='changelog',
+            name='changelog_department_seq',
+        ),
+        migrations.RenameField(
+            model_name='changelog',
+            old_name='seq',
+            new_name='id',
+        ),
+        migrations.AddField(
+            model_name='changelog',
+            name='seq',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.RunPython(number_existing, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['department_id', 'seq'], name='changelog_department_seq'),
+        ),
+    ]
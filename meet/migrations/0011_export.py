@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('meet', '0010_changelog_publish'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Export',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CERTIFICATES', 'Certificates'), ('DEPARTMENT_REPORTS', 'Department reports')], max_length=32)),
+                ('department_id', models.BigIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=16)),
+                ('path', models.CharField(blank=True, max_length=500)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('meet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to='meet.meet')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'meet', 'department_id', 'created_at'], name='export_latest'), models.Index(fields=['status', 'created_at'], name='export_queue')],
+            },
+        ),
+    ]
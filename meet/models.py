@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 from accounts.models import User
 
@@ -25,6 +26,7 @@ class Meet(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
     status = models.CharField(max_length=16, choices=MeetStatus.choices, default=MeetStatus.DRAFT)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -51,6 +53,7 @@ class Event(models.Model):
         default=EventGender.BOYS
     )
     status = models.CharField(max_length=16, choices=EventStatus.choices, default=EventStatus.ACTIVE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("meet", "name")
@@ -69,6 +72,7 @@ class Registration(models.Model):
         related_name="registrations_done"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("event", "participant")
@@ -79,3 +83,198 @@ class Registration(models.Model):
 
     def __str__(self):
         return f"{self.participant.email} → {self.event.name}"
+
+
+class PendingRegistration(models.Model):
+    """Self-registration queued by the write-behind intake; see meet/intake.py."""
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="+")
+    participant = models.ForeignKey(User, on_delete=models.CASCADE, related_name="pending_registrations")
+    registered_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("event", "participant")
+
+    def __str__(self):
+        return f"{self.participant_id} → {self.event_id} (pending)"
+
+
+class BibSequence(models.Model):
+    """
+    Per-meet hi counter for bib numbers.
+
+    Each increment reserves a block of ``BIB_BLOCK_SIZE`` numbers that a
+    process then hands out from memory (see meet/bibs.py), so the row is
+    touched once per block rather than once per bib.
+    """
+    meet = models.OneToOneField(Meet, on_delete=models.CASCADE, primary_key=True, related_name="bib_sequence")
+    next_block = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.meet.name}: next block {self.next_block}"
+
+
+class Bib(models.Model):
+    meet = models.ForeignKey(Meet, on_delete=models.CASCADE, related_name="bibs")
+    participant = models.ForeignKey(User, on_delete=models.CASCADE, related_name="bibs")
+    number = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = [("meet", "participant"), ("meet", "number")]
+
+    def __str__(self):
+        return f"{self.number} ({self.participant.email})"
+
+
+class CheckIn(models.Model):
+    registration = models.OneToOneField(
+        Registration,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="check_in"
+    )
+    checked_in_at = models.DateTimeField()
+    checked_in_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="check_ins_done"
+    )
+
+    def __str__(self):
+        return f"{self.registration} checked in at {self.checked_in_at:%H:%M}"
+
+
+class ChangeKind(models.TextChoices):
+    MEET = "meet", "Meet"
+    EVENT = "event", "Event"
+    REGISTRATION = "registration", "Registration"
+
+
+class ChangeLog(models.Model):
+    """
+    One row per create, change or delete, for delta sync (see meet/changelog.py).
+
+    Rows are inserted with the change and get their ``seq`` once it has
+    committed, in commit order, so a client's cursor is the last ``seq`` it
+    has seen. Deletes stay behind as tombstones. ``department_id`` is the
+    participant's department for registrations and empty for meets and
+    events, which every coordinator sees.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    seq = models.BigIntegerField(null=True, blank=True, unique=True)
+    kind = models.CharField(max_length=16, choices=ChangeKind.choices)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    department_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["department_id", "seq"], name="changelog_department_seq"),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq or '-'} {self.kind} {self.object_id}{' (deleted)' if self.deleted else ''}"
+
+
+class ResultStatus(models.TextChoices):
+    FINISHED = "FINISHED", "Finished"
+    DNF = "DNF", "Did not finish"
+    DNS = "DNS", "Did not start"
+    DQ = "DQ", "Disqualified"
+
+
+class Result(models.Model):
+    registration = models.ForeignKey(Registration, on_delete=models.CASCADE, related_name="results")
+    round = models.PositiveSmallIntegerField(default=1)
+    heat = models.PositiveSmallIntegerField(default=1)
+    place = models.PositiveIntegerField(null=True, blank=True)
+    # as reported by the timing system, e.g. "12.34" or "1:02.45"
+    mark = models.CharField(max_length=32, blank=True)
+    mark_seconds = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=16, choices=ResultStatus.choices, default=ResultStatus.FINISHED)
+    source = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ("registration", "round")
+
+    def __str__(self):
+        return f"{self.registration} – {self.mark or self.get_status_display()}"
+
+
+class NotificationKind(models.TextChoices):
+    REGISTRATION_CONFIRMED = "REGISTRATION_CONFIRMED", "Registration confirmed"
+    SCHEDULE_CHANGED = "SCHEDULE_CHANGED", "Schedule changed"
+
+
+class NotificationStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    SENT = "SENT", "Sent"
+    FAILED = "FAILED", "Failed"
+
+
+class Notification(models.Model):
+    """Outbox row for one email; see meet/notifications.py."""
+
+    kind = models.CharField(max_length=32, choices=NotificationKind.choices)
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=16, choices=NotificationStatus.choices, default=NotificationStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "send_after"], name="notification_due"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} → {self.email} ({self.get_status_display()})"
+
+
+class ExportKind(models.TextChoices):
+    CERTIFICATES = "CERTIFICATES", "Certificates"
+    DEPARTMENT_REPORTS = "DEPARTMENT_REPORTS", "Department reports"
+
+
+class ExportStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    RUNNING = "RUNNING", "Running"
+    DONE = "DONE", "Done"
+    FAILED = "FAILED", "Failed"
+
+
+class Export(models.Model):
+    """A zip archive built by the ``run_exports`` worker; see meet/exports.py."""
+
+    kind = models.CharField(max_length=32, choices=ExportKind.choices)
+    meet = models.ForeignKey(Meet, on_delete=models.CASCADE, related_name="exports")
+    # empty for every department
+    department_id = models.BigIntegerField(null=True, blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    status = models.CharField(max_length=16, choices=ExportStatus.choices, default=ExportStatus.PENDING)
+    path = models.CharField(max_length=500, blank=True)
+    count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "meet", "department_id", "created_at"], name="export_latest"),
+            models.Index(fields=["status", "created_at"], name="export_queue"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.meet_id} ({self.get_status_display()})"
@@ -0,0 +1,186 @@
+"""
+Email notifications through an outbox.
+
+Queuing a message only inserts a ``Notification`` row (in the caller's
+transaction) and, once that commits, hands its id to an in-process
+``BatchWriter``. The writer sends whole batches over one opened
+connection of the configured email backend. Failed messages are retried
+with exponential backoff by the ``send_notifications`` command, which also
+picks up anything a restarted process never got to.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .batching import BatchWriter
+from .models import Notification, NotificationKind, NotificationStatus, Registration
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+CLAIM_SECONDS = 300
+
+
+def _queue(notifications):
+    notifications = Notification.objects.bulk_create(notifications)
+    ids = [notification.pk for notification in notifications]
+    if ids and getattr(settings, "NOTIFICATIONS_SEND_IN_PROCESS", True):
+        transaction.on_commit(lambda: [writer.put(pk) for pk in ids])
+    return len(ids)
+
+
+def registration_confirmed(registration, registered_by=None):
+    participant, event = registration.participant, registration.event
+    if not participant.email:
+        return 0
+    body = render_to_string("meet/notifications/registration_confirmed.txt", {
+        "name": participant.full_name,
+        "event": event.name,
+        "meet": event.meet.name,
+        "start_date": event.meet.start_date,
+        "end_date": event.meet.end_date,
+        "registered_by": registered_by.full_name or registered_by.email if registered_by else None,
+    })
+    return _queue([Notification(
+        kind=NotificationKind.REGISTRATION_CONFIRMED,
+        recipient=participant,
+        email=participant.email,
+        subject=f"Registered: {event.name} ({event.meet.name})",
+        body=body,
+    )])
+
+
+def schedule_changed(meet):
+    """Tell everyone registered in ``meet`` that its dates or status changed."""
+    rows = (
+        Registration.objects.filter(event__meet=meet)
+        .order_by("participant_id", "event__name")
+        .values_list("participant_id", "participant__email", "participant__full_name", "event__name")
+    )
+    events = {}
+    people = {}
+    for participant_id, email, name, event in rows.iterator(chunk_size=5000):
+        if email:
+            people[participant_id] = (email, name)
+            events.setdefault(participant_id, []).append(event)
+
+    context = {
+        "meet": meet.name,
+        "start_date": meet.start_date,
+        "end_date": meet.end_date,
+        "status": meet.get_status_display(),
+    }
+    return _queue([
+        Notification(
+            kind=NotificationKind.SCHEDULE_CHANGED,
+            recipient_id=participant_id,
+            email=email,
+            subject=f"Schedule update: {meet.name}",
+            body=render_to_string(
+                "meet/notifications/schedule_changed.txt",
+                {**context, "name": name, "events": events[participant_id]},
+            ),
+        )
+        for participant_id, (email, name) in people.items()
+    ])
+
+
+def deliver(notifications):
+    """Send ``notifications`` over one connection and record the outcome; return how many were sent."""
+    if not notifications:
+        return 0
+
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+        for notification in notifications:
+            message = EmailMessage(notification.subject, notification.body, None, [notification.email], connection=connection)
+            try:
+                connection.send_messages([message])
+                sent.append(notification.pk)
+            except Exception as exc:
+                failed.append((notification, exc))
+                # the connection may be what broke; start the rest on a fresh one
+                connection.close()
+                connection.open()
+    except Exception as exc:
+        done = set(sent) | {notification.pk for notification, _ in failed}
+        failed.extend((notification, exc) for notification in notifications if notification.pk not in done)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    now = timezone.now()
+    Notification.objects.filter(pk__in=sent).update(
+        status=NotificationStatus.SENT, sent_at=now, attempts=F("attempts") + 1, last_error=""
+    )
+    for notification, exc in failed:
+        attempts = notification.attempts + 1
+        Notification.objects.filter(pk=notification.pk).update(
+            attempts=attempts,
+            last_error=str(exc)[:1000],
+            status=NotificationStatus.FAILED if attempts >= MAX_ATTEMPTS else NotificationStatus.PENDING,
+            send_after=now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1)),
+        )
+    if failed:
+        logger.warning("Could not send %d of %d notifications", len(failed), len(notifications))
+    return len(sent)
+
+
+def claim(queryset, limit):
+    """
+    Take up to ``limit`` due notifications from ``queryset`` for sending.
+
+    Claiming pushes ``send_after`` out by ``CLAIM_SECONDS``, so neither a
+    concurrent sender nor the retry command picks them up meanwhile, and a
+    sender that dies mid-batch only delays them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            queryset.filter(status=NotificationStatus.PENDING, send_after__lte=now)
+            .select_for_update(skip_locked=True)
+            .order_by("send_after", "pk")[:limit]
+        )
+        Notification.objects.filter(pk__in=[notification.pk for notification in batch]).update(
+            send_after=now + timedelta(seconds=CLAIM_SECONDS)
+        )
+    return batch
+
+
+def send_due(batch_size=None):
+    """Send everything that is due, batch by batch; return ``(sent, attempted, seconds)``."""
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    started = time.perf_counter()
+    sent = attempted = 0
+    while True:
+        batch = claim(Notification.objects.all(), batch_size)
+        if not batch:
+            break
+        attempted += len(batch)
+        sent += deliver(batch)
+    return sent, attempted, time.perf_counter() - started
+
+
+def _send_ids(ids):
+    deliver(claim(Notification.objects.filter(pk__in=ids), len(ids)))
+
+
+writer = BatchWriter(
+    _send_ids,
+    batch_size=getattr(settings, "NOTIFICATION_BATCH_SIZE", 100),
+    interval=getattr(settings, "NOTIFICATION_FLUSH_INTERVAL", 1.0),
+    name="notifications",
+)
@@ -0,0 +1,40 @@
+"""
+Ordered, bounded fan-out to a process pool.
+
+Shared by the bulk renderers (certificates, department reports): tasks are
+plain picklable data, results come back in submission order, and only
+``2 * workers`` tasks are in flight, so a producer that streams from the
+database never gets far ahead of the consumer.
+
+Only call it from management commands and the ``run_exports`` worker:
+forking a threaded web server with open database and cache connections
+is unsafe, and a request would be tied up for the whole batch.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+
+
+def _init_worker():
+    # a "spawn" worker starts from scratch; a forked one is already set up
+    if not apps.ready:
+        django.setup()
+
+
+def ordered_map(fn, tasks, workers):
+    """Yield ``fn(task)`` for each task, in order; ``workers == 1`` runs in-process."""
+    if workers == 1:
+        for task in tasks:
+            yield fn(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        in_flight = deque()
+        for task in tasks:
+            in_flight.append(pool.submit(fn, task))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
@@ -0,0 +1,292 @@
+"""
+Results ingestion from timing-system files.
+
+Parsers stream a file row by row into plain dicts:
+
+* FinishLynx ``.lif``: a header line ``event number, round, heat, event
+  name, ...`` followed by ``place, id (bib), lane, last name, first name,
+  affiliation, time, ...`` lines. An id of ``REG:<register number>``
+  names a competitor without a bib.
+* ``.csv`` exports with a header row naming at least ``event`` and one of
+  ``bib`` / ``register_number``, plus optional ``round``, ``heat``,
+  ``place`` and ``time`` columns.
+
+Bibs and register numbers are matched separately, as at check-in, since
+a numeric register number can equal someone else's bib.
+
+Rows are matched to registrations through a ``ResultIndex`` built with one
+query per meet, and written with batched upserts, so importing a file
+costs a handful of queries however many rows it has. A file is imported
+in one transaction: one that fails writes nothing. ``watch`` polls a
+drop folder and imports each new file once its size has stopped changing.
+"""
+import csv
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import OuterRef, Subquery
+
+from .checkin import BIB, REGISTER_NUMBER, normalize_bib, parse_code
+from .models import Bib, Event, Registration, Result, ResultStatus
+from .versions import generations
+
+
+logger = logging.getLogger(__name__)
+
+STATUSES = {status.value: status for status in ResultStatus}
+STATUSES.update({"DSQ": ResultStatus.DQ, "DQF": ResultStatus.DQ})
+
+_MARK = re.compile(r"^(?:(\d+):)?(\d+(?:\.\d+)?)$")
+
+
+def normalize(code):
+    return str(code or "").strip().upper()
+
+
+def parse_mark(mark):
+    """``"1:02.45"`` -> ``62.45``; None for anything that isn't a time."""
+    match = _MARK.match(mark.strip())
+    if match is None:
+        return None
+    minutes, seconds = match.groups()
+    return int(minutes or 0) * 60 + float(seconds)
+
+
+def _int(value, default=None):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return default
+
+
+def _row(event, round_, heat, place, code, kind, mark):
+    place_text = normalize(place)
+    mark = (mark or "").strip()
+    status = STATUSES.get(place_text) or STATUSES.get(normalize(mark)) or ResultStatus.FINISHED
+    kind, code = parse_code(code, kind)
+    return {
+        "event": (event or "").strip(),
+        "round": round_ or 1,
+        "heat": heat or 1,
+        "place": _int(place) if status == ResultStatus.FINISHED else None,
+        "kind": kind,
+        "code": code,
+        "mark": mark if status == ResultStatus.FINISHED else "",
+        "status": status,
+    }
+
+
+def parse_lif(lines):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header or len(header) < 4:
+        raise ValueError("Missing .lif header line")
+    event, round_, heat = header[3].strip() or header[0], _int(header[1], 1), _int(header[2], 1)
+    for fields in reader:
+        if len(fields) < 2 or not fields[1].strip():
+            continue
+        fields += [""] * (7 - len(fields))
+        yield _row(event, round_, heat, fields[0], fields[1], BIB, fields[6])
+
+
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    columns = {name.strip().lower(): name for name in reader.fieldnames or ()}
+    if "event" not in columns or not ({"bib", "register_number"} & set(columns)):
+        raise ValueError("CSV needs an event column and a bib or register_number column")
+
+    def get(row, name):
+        return row.get(columns[name]) if name in columns else None
+
+    for row in reader:
+        bib, register_number = get(row, "bib"), get(row, "register_number")
+        if not (bib or register_number):
+            continue
+        yield _row(
+            get(row, "event"),
+            _int(get(row, "round"), 1),
+            _int(get(row, "heat"), 1),
+            get(row, "place"),
+            bib or register_number,
+            BIB if bib else REGISTER_NUMBER,
+            get(row, "time") or get(row, "mark"),
+        )
+
+
+PARSERS = {".lif": parse_lif, ".csv": parse_csv}
+
+
+class ResultIndex:
+    """
+    ``(event, bib)`` and ``(event, register number) -> registration`` for one meet.
+
+    Events are looked up by name or id; a key that fits more than one
+    event matches none. Rebuilt only when the registration or bib
+    generations move, so a long-running watcher keeps up with late
+    registrations.
+    """
+
+    def __init__(self, meet_id):
+        self.meet_id = meet_id
+        self.stamps = None
+        self.events = {}
+        self.ambiguous = set()
+        self.bibs = {}
+        self.register_numbers = {}
+
+    def refresh(self):
+        stamps = generations(["registrations", "events", f"bibs:{self.meet_id}"])
+        if stamps == self.stamps:
+            return
+        self.stamps = stamps
+
+        events = {}
+        for pk, name in Event.objects.filter(meet_id=self.meet_id).values_list("id", "name"):
+            for key in {normalize(name), str(pk)}:
+                events.setdefault(key, set()).add(pk)
+        # "100m" and "100M", or a name that is another event's id, could
+        # mean either event; their rows are reported unmatched, not guessed
+        self.ambiguous = {key for key, ids in events.items() if len(ids) > 1}
+        if self.ambiguous:
+            logger.warning("Meet %s: ambiguous event names %s", self.meet_id, ", ".join(sorted(self.ambiguous)))
+        self.events = {key: next(iter(ids)) for key, ids in events.items() if len(ids) == 1}
+
+        bib = Bib.objects.filter(meet_id=self.meet_id, participant_id=OuterRef("participant_id"))
+        rows = (
+            Registration.objects.filter(event__meet_id=self.meet_id)
+            .annotate(bib=Subquery(bib.values("number")[:1]))
+            .values_list("id", "event_id", "participant__register_number", "bib")
+        )
+        self.bibs = {}
+        self.register_numbers = {}
+        for pk, event_id, register_number, number in rows.iterator(chunk_size=5000):
+            if register_number:
+                self.register_numbers[event_id, normalize(register_number)] = pk
+            if number is not None:
+                self.bibs[event_id, normalize_bib(number)] = pk
+
+    def event_id(self, name):
+        return self.events.get(normalize(name))
+
+    def registration_id(self, event_id, kind, code):
+        if kind == BIB:
+            return self.bibs.get((event_id, normalize_bib(code)))
+        return self.register_numbers.get((event_id, normalize(code)))
+
+
+class ImportReport:
+    def __init__(self, path):
+        self.path = str(path)
+        self.rows = 0
+        self.written = 0
+        self.unmatched = []  # (event, code)
+        self.error = None
+
+    def __str__(self):
+        if self.error:
+            return f"{self.path}: failed ({self.error})"
+        return f"{self.path}: {self.written}/{self.rows} rows written, {len(self.unmatched)} unmatched"
+
+
+def _write(results):
+    Result.objects.bulk_create(
+        results,
+        update_conflicts=True,
+        unique_fields=["registration", "round"],
+        update_fields=["heat", "place", "mark", "mark_seconds", "status", "source", "updated_at"],
+    )
+
+
+def import_file(path, index, batch_size=1000):
+    """Import one result file into ``index``'s meet; return an ``ImportReport``."""
+    path = Path(path)
+    report = ImportReport(path)
+    parser = PARSERS.get(path.suffix.lower())
+    if parser is None:
+        report.error = f"unsupported file type {path.suffix}"
+        return report
+
+    index.refresh()
+    batch = {}
+    try:
+        with transaction.atomic(), path.open(newline="", encoding="utf-8-sig") as lines:
+            for row in parser(lines):
+                report.rows += 1
+                event_id = index.event_id(row["event"])
+                registration_id = index.registration_id(event_id, row["kind"], row["code"]) if event_id else None
+                if registration_id is None:
+                    report.unmatched.append((row["event"], row["code"]))
+                    continue
+                # the last line for a registration wins, as in the file
+                batch[registration_id, row["round"]] = Result(
+                    registration_id=registration_id,
+                    round=row["round"],
+                    heat=row["heat"],
+                    place=row["place"],
+                    mark=row["mark"],
+                    mark_seconds=parse_mark(row["mark"]) if row["mark"] else None,
+                    status=row["status"],
+                    source=path.name,
+                )
+                if len(batch) >= batch_size:
+                    _write(list(batch.values()))
+                    report.written += len(batch)
+                    batch = {}
+            if batch:
+                _write(list(batch.values()))
+                report.written += len(batch)
+    except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+        report.error = str(exc)
+    except DatabaseError as exc:
+        # e.g. a registration deleted since the index was built; the
+        # file goes to failed/ and the watcher carries on
+        logger.exception("Could not import %s", path)
+        report.error = f"database error: {exc}"
+    if report.error:
+        report.written = 0
+    return report
+
+
+def _settle(folder, seen):
+    """Files in ``folder`` whose size and mtime are unchanged since the previous poll."""
+    ready = []
+    current = {}
+    for entry in os.scandir(folder):
+        if not entry.is_file() or entry.name.startswith(".") or Path(entry.name).suffix.lower() not in PARSERS:
+            continue
+        stat = entry.stat()
+        current[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        if seen.get(entry.path) == current[entry.path]:
+            ready.append(Path(entry.path))
+    seen.clear()
+    seen.update(current)
+    return sorted(ready, key=lambda path: current[str(path)][1])
+
+
+def watch(folder, meet_id, interval=0.25, stop=None):
+    """
+    Import files dropped into ``folder`` and move them to ``processed/`` or
+    ``failed/`` underneath it; yields an ``ImportReport`` per file.
+    """
+    folder = Path(folder)
+    for name in ("processed", "failed"):
+        (folder / name).mkdir(exist_ok=True)
+
+    index = ResultIndex(meet_id)
+    seen = {}
+    while stop is None or not stop():
+        for path in _settle(folder, seen):
+            report = import_file(path, index)
+            target = folder / ("failed" if report.error else "processed") / path.name
+            if target.exists():
+                target = target.with_name(f"{path.stem}-{time.time_ns()}{path.suffix}")
+            shutil.move(str(path), target)
+            seen.pop(str(path), None)
+            yield report
+            close_old_connections()
+        time.sleep(interval)
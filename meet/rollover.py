@@ -0,0 +1,117 @@
+"""
+Yearly meet rollover.
+
+``clone_meet`` copies a meet and all of its events (and, optionally, the
+registrations of returning participants) with a handful of
+``bulk_create`` calls in one transaction. ``complete_meets`` closes the
+events of finished meets and marks them completed with one ``UPDATE``
+each. Both bypass the model signals, so they write the change log
+themselves and invalidate caches once the transaction commits.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from accounts import audit
+from accounts.models import AuditAction, UserRole
+from . import changelog
+from .feed import ADDED
+from .models import ChangeKind, Event, EventStatus, Meet, MeetStatus, Registration
+from .signals import registrations_changed
+from .versions import bump
+
+
+def next_year(day):
+    try:
+        return day.replace(year=day.year + 1)
+    except ValueError:
+        # 29 February
+        return day.replace(year=day.year + 1, day=28)
+
+
+def clone_meet(meet, name=None, start_date=None, end_date=None, reregister=False, registered_by=None):
+    """
+    Copy ``meet`` with the same events as a draft; return ``(meet, events, registrations)``.
+
+    Dates default to a year after the original's. With ``reregister``,
+    active students registered for an event of ``meet`` are registered
+    for its copy as well. Those are the only registrations a draft can
+    hold (``Registration.clean`` turns away everyone else): the meet only
+    opens, to them and to new ones, once an admin activates it.
+    """
+    with transaction.atomic():
+        clone = Meet.objects.create(
+            name=name or meet.name,
+            start_date=start_date or next_year(meet.start_date),
+            end_date=end_date or next_year(meet.end_date),
+            status=MeetStatus.DRAFT,
+        )
+        originals = list(meet.events.order_by("id").values_list("id", "name", "event_type", "gender"))
+        events = Event.objects.bulk_create([
+            Event(meet=clone, name=event_name, event_type=event_type, gender=gender, status=EventStatus.ACTIVE)
+            for _, event_name, event_type, gender in originals
+        ])
+        copies = {original[0]: event.pk for original, event in zip(originals, events)}
+
+        registrations = []
+        if reregister and copies:
+            returning = Registration.objects.filter(
+                event__meet=meet,
+                participant__is_active=True,
+                participant__role=UserRole.STUDENT,
+            ).values_list("event_id", "participant_id")
+            registrations = Registration.objects.bulk_create([
+                Registration(
+                    event_id=copies[event_id],
+                    participant_id=participant_id,
+                    registered_by=registered_by,
+                )
+                for event_id, participant_id in returning.iterator(chunk_size=5000)
+            ], batch_size=1000)
+
+        # bulk_create skips post_save, so log and notify directly
+        changelog.record(ChangeKind.EVENT, [(event.pk, False, None) for event in events])
+        changelog.record_registrations([registration.pk for registration in registrations])
+        transaction.on_commit(lambda: _cloned(clone, list(copies.values()), registrations, registered_by))
+    return clone, len(events), len(registrations)
+
+
+def _cloned(meet, event_ids, registrations, registered_by):
+    bump("events")
+    if not registrations:
+        return
+    registrations_changed(
+        event_ids,
+        [(ADDED, registration.event_id, registration.participant_id) for registration in registrations],
+    )
+    actor_id = registered_by.pk if registered_by else None
+    for registration in registrations:
+        audit.record(
+            AuditAction.REGISTRATION_CREATED,
+            actor_id=actor_id,
+            user_id=registration.participant_id,
+            event_id=registration.event_id,
+            source="rollover",
+            meet_id=meet.pk,
+        )
+
+
+def complete_meets(meet_ids):
+    """
+    Close every event of ``meet_ids`` and mark the meets completed; return ``(meets, events)`` changed.
+
+    Participants are not notified, unlike a status change saved through
+    the admin form.
+    """
+    meet_ids = list(meet_ids)
+    now = timezone.now()
+    with transaction.atomic():
+        events = Event.objects.filter(meet_id__in=meet_ids).exclude(status=EventStatus.INACTIVE)
+        event_ids = list(events.values_list("id", flat=True))
+        closed = Event.objects.filter(id__in=event_ids).update(status=EventStatus.INACTIVE, updated_at=now)
+        meets = Meet.objects.filter(id__in=meet_ids).exclude(status=MeetStatus.COMPLETED)
+        meet_ids = list(meets.values_list("id", flat=True))
+        completed = Meet.objects.filter(id__in=meet_ids).update(status=MeetStatus.COMPLETED, updated_at=now)
+        changelog.record(ChangeKind.MEET, [(meet_id, False, None) for meet_id in meet_ids])
+        changelog.record(ChangeKind.EVENT, [(event_id, False, None) for event_id in event_ids])
+        transaction.on_commit(lambda: bump("events", *(f"event:{event_id}" for event_id in event_ids)))
+    return completed, closed
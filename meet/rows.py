@@ -0,0 +1,111 @@
+"""
+Lightweight read path for list endpoints.
+
+Instead of building a model instance and walking every serializer field
+per row, the serializer's (already shaped) field set is compiled once
+into a ``values_list()`` plan and rows are assembled into plain dicts.
+Only plain columns, foreign key IDs, dates and nested model serializers
+are supported; anything else falls back to the regular serializer.
+"""
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+_PASSTHROUGH = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    PrimaryKeyRelatedField,
+)
+_CONVERTED = (serializers.DateField, serializers.DateTimeField)
+
+
+def _converter(field):
+    """
+    ``field.to_representation``, with the ISO 8601 datetime case inlined:
+    DRF resolves the timezone and output format on every call, which
+    dominates the cost of a row.
+    """
+    if not isinstance(field, serializers.DateTimeField):
+        return field.to_representation
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return convert
+
+
+class Unsupported(Exception):
+    pass
+
+
+def _compile(serializer, prefix, lookups):
+    """Return ``(pk_index, [(name, index, convert_or_nested)])`` for one level."""
+    model = serializer.Meta.model
+    pk_index = len(lookups)
+    lookups.append(prefix + model._meta.pk.name)
+
+    columns = []
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.ModelSerializer):
+            columns.append((name, None, _compile(field, f"{prefix}{field.source}__", lookups)))
+        elif isinstance(field, _CONVERTED):
+            columns.append((name, len(lookups), _converter(field)))
+            lookups.append(prefix + field.source)
+        elif isinstance(field, _PASSTHROUGH) and field.source != "*":
+            columns.append((name, len(lookups), None))
+            lookups.append(prefix + field.source)
+        else:
+            raise Unsupported(name)
+    return pk_index, columns
+
+
+def _assemble(row, plan):
+    pk_index, columns = plan
+    if row[pk_index] is None:
+        return None
+    item = {}
+    for name, index, convert in columns:
+        if index is None:
+            item[name] = _assemble(row, convert)
+        else:
+            value = row[index]
+            item[name] = convert(value) if convert is not None and value is not None else value
+    return item
+
+
+def serialize_rows(queryset, serializer):
+    """
+    Render ``queryset`` the way ``serializer`` (unbound, ``many=False``)
+    would, straight from ``values_list()`` rows.
+
+    Raises ``Unsupported`` if the serializer has a field this path can't
+    reproduce.
+    """
+    lookups = []
+    plan = _compile(serializer, "", lookups)
+    return [_assemble(row, plan) for row in queryset.values_list(*lookups)]
+
+
+class RowListMixin:
+    """Serve unpaginated ``list`` responses through ``serialize_rows``."""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        try:
+            data = serialize_rows(queryset, self.get_serializer())
+        except Unsupported:
+            return super().list(request, *args, **kwargs)
+        return Response(data)
@@ -1,21 +1,115 @@
 from rest_framework import serializers
+
+from accounts.models import User
 from .models import Meet, Event, Registration
 
 
+def _split(value):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+class Shape:
+    """
+    Requested response shape, parsed from ``?fields=`` and ``?expand=``.
+
+    ``fields`` is ``None`` when every field is wanted. ``expand`` maps a
+    relation name to the shape of its nested representation. Dotted names
+    (``fields=id,event.name``, ``expand=event.meet``) reach into
+    expanded relations.
+    """
+
+    def __init__(self):
+        self.fields = None
+        self.expand = {}
+
+    @classmethod
+    def from_query_params(cls, params):
+        shape = cls()
+        for path in _split(params.get("expand")):
+            shape._node(path.split("."))
+        for path in _split(params.get("fields")):
+            *relations, name = path.split(".")
+            node = shape._node(relations)
+            node.fields = (node.fields or set()) | {name}
+        shape._keep_expanded()
+        return shape
+
+    def _node(self, relations):
+        node = self
+        for relation in relations:
+            node = node.expand.setdefault(relation, Shape())
+        return node
+
+    def _keep_expanded(self):
+        for relation, child in self.expand.items():
+            if self.fields is not None:
+                self.fields.add(relation)
+            child._keep_expanded()
+
+    def is_default(self):
+        return self.fields is None and not self.expand
+
+
+class ShapedModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer that trims fields and nests relations to match a ``Shape``."""
+
+    expandable = {}
+    # for models without ``updated_at``: the generation scope their
+    # signals bump, so conditional GETs notice edits to expanded copies
+    generation_scope = None
 
-class MeetSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, shape=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if shape is None:
+            return
+        for relation, child_shape in shape.expand.items():
+            if relation in self.expandable and relation in self.fields:
+                self.fields[relation] = self.expandable[relation](shape=child_shape, read_only=True)
+        if shape.fields is not None:
+            for name in set(self.fields) - shape.fields:
+                self.fields.pop(name)
+
+
+class MeetSerializer(ShapedModelSerializer):
     class Meta:
         model = Meet
         fields = "__all__"
 
 
-class EventSerializer(serializers.ModelSerializer):
+class MeetCloneSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255, required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    reregister = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        # check the dates the clone will get; the view passes the defaults
+        start_date = attrs.get("start_date") or self.context["start_date"]
+        end_date = attrs.get("end_date") or self.context["end_date"]
+        if end_date < start_date:
+            raise serializers.ValidationError({"end_date": ["End date is before the start date."]})
+        return attrs
+
+
+class EventSerializer(ShapedModelSerializer):
+    expandable = {"meet": MeetSerializer}
+
     class Meta:
         model = Event
         fields = "__all__"
 
 
-class RegistrationSerializer(serializers.ModelSerializer):
+class ParticipantSerializer(ShapedModelSerializer):
+    generation_scope = "students"
+
+    class Meta:
+        model = User
+        fields = ["id", "full_name", "register_number", "email", "gender", "department"]
+
+
+class RegistrationSerializer(ShapedModelSerializer):
+    expandable = {"event": EventSerializer, "participant": ParticipantSerializer}
+
     class Meta:
         model = Registration
         fields = "__all__"
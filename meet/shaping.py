@@ -0,0 +1,62 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from .serializers import Shape
+
+
+def shape_queryset(queryset, serializer_class, shape):
+    """
+    Restrict ``queryset`` to the columns ``shape`` renders.
+
+    Expanded relations are joined with ``select_related`` and every level
+    is narrowed with ``only()``, so a shaped list is a single query.
+    """
+    related, columns = [], []
+    _collect(serializer_class, shape, "", related, columns)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+def _collect(serializer_class, shape, prefix, related, columns):
+    model = serializer_class.Meta.model
+    concrete = {field.name for field in model._meta.concrete_fields}
+    names = shape.fields if shape.fields is not None else _declared_fields(serializer_class, concrete)
+
+    columns.append(prefix + model._meta.pk.name)
+    columns.extend(prefix + name for name in names if name in concrete)
+
+    for relation, child_shape in shape.expand.items():
+        child_class = serializer_class.expandable.get(relation)
+        if child_class is None or relation not in names:
+            continue
+        related.append(prefix + relation)
+        _collect(child_class, child_shape, f"{prefix}{relation}__", related, columns)
+
+
+def _declared_fields(serializer_class, concrete):
+    fields = serializer_class.Meta.fields
+    return concrete if fields == "__all__" else set(fields)
+
+
+class ShapedViewSetMixin:
+    """Apply ``?fields=`` / ``?expand=`` to read requests of a ModelViewSet."""
+
+    def get_shape(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        if not hasattr(self, "_shape"):
+            self._shape = Shape.from_query_params(self.request.query_params)
+        return self._shape
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        shape = self.get_shape()
+        if shape is None or shape.is_default():
+            return queryset
+        return shape_queryset(queryset, self.get_serializer_class(), shape)
+
+    def get_serializer(self, *args, **kwargs):
+        shape = self.get_shape()
+        if shape is not None and not shape.is_default():
+            kwargs["shape"] = shape
+        return super().get_serializer(*args, **kwargs)
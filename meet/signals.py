@@ -0,0 +1,102 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts import audit
+from accounts.models import AuditAction, User
+from . import bibs, changelog, notifications
+from .feed import ADDED, REMOVED, publish_changes
+from .models import ChangeKind, Event, Meet, Registration
+from .versions import bump
+
+
+logger = logging.getLogger(__name__)
+
+
+def _publish(changes):
+    # the feed is best effort; never fail the request that made the change
+    try:
+        publish_changes(changes)
+    except Exception:
+        logger.exception("Could not publish registration changes")
+
+
+def _assign_bibs(changes):
+    added = [(event_id, participant_id) for kind, event_id, participant_id in changes if kind == ADDED]
+    if not added:
+        return
+    try:
+        bibs.assign_for_registrations(added)
+    except Exception:
+        # assign_bibs can fill any gaps later
+        logger.exception("Could not assign bib numbers")
+
+
+def registrations_changed(event_ids, changes=()):
+    bump("registrations", *(f"event:{event_id}" for event_id in set(event_ids)))
+    if changes:
+        changes = list(changes)
+        _assign_bibs(changes)
+        _publish(changes)
+
+
+def _audit_registration(action, instance, actor_id):
+    # capture now: a deleted instance loses its pk before the commit
+    entry = {
+        "actor_id": actor_id,
+        "user_id": instance.participant_id,
+        "event_id": instance.event_id,
+        "registration_id": instance.pk,
+    }
+    transaction.on_commit(lambda: audit.record(action, **entry))
+
+
+@receiver(post_save, sender=Registration)
+def registration_saved(sender, instance, created, **kwargs):
+    changes = [(ADDED, instance.event_id, instance.participant_id)] if created else []
+    event_ids = [instance.event_id]
+    transaction.on_commit(lambda: registrations_changed(event_ids, changes))
+    changelog.record_registrations([instance.pk])
+    if created:
+        actor_id = audit.current_actor_id() or instance.registered_by_id
+        _audit_registration(AuditAction.REGISTRATION_CREATED, instance, actor_id)
+
+
+@receiver(post_delete, sender=Registration)
+def registration_deleted(sender, instance, **kwargs):
+    changes = [(REMOVED, instance.event_id, instance.participant_id)]
+    event_ids = [instance.event_id]
+    # the participant may be going away in the same cascade, so look it up now
+    department_id = User.objects.filter(pk=instance.participant_id).values_list("department_id", flat=True).first()
+    transaction.on_commit(lambda: registrations_changed(event_ids, changes))
+    changelog.record(ChangeKind.REGISTRATION, [(instance.pk, True, department_id)])
+    _audit_registration(AuditAction.REGISTRATION_DELETED, instance, audit.current_actor_id())
+
+
+@receiver([post_save, post_delete], sender=Meet)
+@receiver([post_save, post_delete], sender=Event)
+def meet_or_event_changed(sender, instance, signal, **kwargs):
+    kind = ChangeKind.MEET if sender is Meet else ChangeKind.EVENT
+    transaction.on_commit(lambda: bump("events"))
+    changelog.record(kind, [(instance.pk, signal is post_delete, None)])
+
+
+SCHEDULE_FIELDS = ("start_date", "end_date", "status")
+
+
+@receiver(pre_save, sender=Meet)
+def remember_meet_schedule(sender, instance, **kwargs):
+    instance._previous_schedule = (
+        Meet.objects.filter(pk=instance.pk).values_list(*SCHEDULE_FIELDS).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Meet)
+def meet_schedule_changed(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_schedule", None)
+    if created or previous is None:
+        return
+    if tuple(str(value) for value in previous) != tuple(str(getattr(instance, name)) for name in SCHEDULE_FIELDS):
+        transaction.on_commit(lambda: notifications.schedule_changed(instance))
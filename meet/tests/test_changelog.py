@@ -0,0 +1,50 @@
+import datetime
+from datetime import timedelta
+
+from django.test import TestCase
+
+from meet import changelog
+from meet.models import ChangeLog, Meet
+
+
+class ChangeLogTests(TestCase):
+    def create_meet(self, name):
+        return Meet.objects.create(name=name, start_date=datetime.date(2026, 3, 1), end_date=datetime.date(2026, 3, 2))
+
+    def synced_meets(self, cursor):
+        data = changelog.changes_since(cursor)
+        return [meet["name"] for meet in data["meets"]], data["cursor"]
+
+    def test_rows_are_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_meet("Spring Meet")
+
+        self.assertEqual(self.synced_meets(0)[0], ["Spring Meet"])
+
+    def test_long_running_transaction_is_not_skipped(self):
+        # the slow transaction writes first but has not committed yet
+        with self.captureOnCommitCallbacks() as slow_commit:
+            self.create_meet("Slow Meet")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_meet("Quick Meet")
+
+        names, cursor = self.synced_meets(0)
+        self.assertEqual(names, ["Quick Meet"])
+
+        for callback in slow_commit:
+            callback()
+
+        names, later = self.synced_meets(cursor)
+        self.assertEqual(names, ["Slow Meet"])
+        self.assertGreater(later, cursor)
+        self.assertEqual(changelog.snapshot()["cursor"], later)
+
+    def test_sync_publishes_rows_whose_publisher_died(self):
+        with self.captureOnCommitCallbacks():
+            self.create_meet("Orphaned Meet")
+        self.assertEqual(self.synced_meets(0)[0], [])
+
+        ChangeLog.objects.update(created_at=ChangeLog.objects.get().created_at - timedelta(minutes=1))
+
+        self.assertEqual(self.synced_meets(0)[0], ["Orphaned Meet"])
+        self.assertFalse(ChangeLog.objects.filter(seq__isnull=True).exists())
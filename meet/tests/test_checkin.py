@@ -0,0 +1,60 @@
+import datetime
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from accounts.models import User
+from meet import checkin
+from meet.models import CheckIn, Event, Meet, MeetStatus, Registration
+
+
+def create_event():
+    meet = Meet.objects.create(
+        name="Annual Meet",
+        start_date=datetime.date(2026, 1, 10),
+        end_date=datetime.date(2026, 1, 12),
+        status=MeetStatus.ACTIVE,
+    )
+    return Event.objects.create(meet=meet, name="100m")
+
+
+class RosterTests(TestCase):
+    def test_participant_edit_reaches_a_loaded_roster(self):
+        event = create_event()
+        student = User.objects.create_user("runner@example.com", full_name="Runer", register_number="R01")
+        registration = Registration.objects.create(event=event, participant=student)
+        roster = checkin.Roster(event.pk, event.meet_id)
+        roster.refresh()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student.full_name, student.register_number = "Runner", "R001"
+            student.save()
+        roster.refresh()
+
+        self.assertEqual(roster.lookup("R01"), [])
+        [entry] = roster.lookup("REG:R001")
+        self.assertEqual((entry["registration"], entry["name"]), (registration.pk, "Runner"))
+
+
+class WriteBatchTests(TransactionTestCase):
+    def test_bad_row_does_not_discard_the_batch(self):
+        event = create_event()
+        scanner = User.objects.create_user("scanner@example.com")
+        registrations = [
+            Registration.objects.create(
+                event=event, participant=User.objects.create_user(f"runner{i}@example.com", register_number=f"R{i}")
+            )
+            for i in range(2)
+        ]
+        now = timezone.now()
+        batch = [(event.pk, registration.pk, scanner.pk, now) for registration in registrations]
+        # a registration withdrawn while its scan was queued
+        batch.insert(1, (event.pk, registrations[-1].pk + 100, scanner.pk, now))
+
+        with self.assertLogs("meet.checkin", "WARNING"):
+            checkin._write_batch(batch)
+
+        self.assertEqual(
+            set(CheckIn.objects.values_list("registration_id", flat=True)),
+            {registration.pk for registration in registrations},
+        )
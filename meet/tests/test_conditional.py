@@ -0,0 +1,58 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User, UserRole
+from meet.models import Event, Meet, MeetStatus, Registration
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.meet = Meet.objects.create(
+            name="Annual Meet",
+            start_date=datetime.date(2026, 1, 10),
+            end_date=datetime.date(2026, 1, 12),
+            status=MeetStatus.ACTIVE,
+        )
+        cls.event = Event.objects.create(meet=cls.meet, name="100m")
+        cls.admin = User.objects.create_user("admin@example.com", role=UserRole.ADMIN)
+        cls.student = User.objects.create_user("runner@example.com", full_name="Runner", register_number="R001")
+        Registration.objects.create(event=cls.event, participant=cls.student)
+
+    def get(self, user, url, etag=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(url, HTTP_IF_NONE_MATCH=etag) if etag else client.get(url)
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.get(self.admin, "/api/events/?expand=meet")["ETag"]
+
+        self.assertEqual(self.get(self.admin, "/api/events/?expand=meet", etag).status_code, 304)
+
+    def test_edit_to_expanded_object_changes_the_etag(self):
+        url = f"/api/events/{self.event.pk}/?expand=meet"
+        etag = self.get(self.admin, url)["ETag"]
+
+        self.meet.name = "Renamed Meet"
+        self.meet.save()
+        response = self.get(self.admin, url, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["meet"]["name"], "Renamed Meet")
+
+    def test_edit_to_expanded_participant_changes_the_etag(self):
+        url = "/api/registrations/?expand=participant"
+        with self.captureOnCommitCallbacks(execute=True):
+            etag = self.get(self.student, url)["ETag"]
+        self.assertEqual(self.get(self.student, url, etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.full_name = "Runner Renamed"
+            self.student.save()
+        response = self.get(self.student, url, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(response.json()[0]["participant"]["full_name"], "Runner Renamed")
@@ -0,0 +1,56 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from accounts.models import User
+from meet import intake
+from meet.feed import ADDED
+from meet.models import ChangeKind, ChangeLog, Event, Meet, MeetStatus, PendingRegistration, Registration
+
+
+class DrainTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        meet = Meet.objects.create(
+            name="Annual Meet",
+            start_date=datetime.date(2026, 1, 10),
+            end_date=datetime.date(2026, 1, 12),
+            status=MeetStatus.ACTIVE,
+        )
+        cls.event = Event.objects.create(meet=meet, name="100m")
+        cls.first, cls.second = (
+            User.objects.create_user(f"runner{i}@example.com", register_number=f"R{i:03d}") for i in range(2)
+        )
+
+    @mock.patch("meet.intake.audit")
+    @mock.patch("meet.intake.registrations_changed")
+    def test_only_rows_this_drain_inserted_are_published(self, registrations_changed, audit):
+        PendingRegistration.objects.bulk_create([
+            PendingRegistration(event=self.event, participant=self.first, registered_by=self.first),
+            PendingRegistration(event=self.event, participant=self.second, registered_by=self.second),
+        ])
+        # registered meanwhile by another drainer or the synchronous path
+        Registration.objects.bulk_create([Registration(event=self.event, participant=self.first)])
+        logged = ChangeLog.objects.count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(intake.drain(10), 2)
+
+        created = Registration.objects.get(participant=self.second)
+        self.assertEqual(created.registered_by, self.second)
+        self.assertIsNotNone(created.created_at)
+        self.assertFalse(PendingRegistration.objects.exists())
+        self.assertEqual(
+            list(ChangeLog.objects.order_by("id").values_list("kind", "object_id")[logged:]),
+            [(ChangeKind.REGISTRATION, created.pk)],
+        )
+        registrations_changed.assert_called_once_with([self.event.pk], [(ADDED, self.event.pk, self.second.pk)])
+        self.assertEqual(audit.record.call_count, 1)
+
+    def test_pending_events_are_read_from_the_staging_table(self):
+        intake.submit(self.event, self.first, self.first)
+        intake.submit(self.event, self.first, self.first)
+
+        self.assertEqual(intake.pending_event_ids(self.first.pk), {self.event.pk})
+        self.assertEqual(intake.pending_count(), 1)
@@ -0,0 +1,135 @@
+import datetime
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import Department, User, UserRole
+from meet import notifications
+from meet.models import (
+    Event,
+    Meet,
+    MeetStatus,
+    Notification,
+    NotificationKind,
+    NotificationStatus,
+    Registration,
+)
+
+
+class RejectingBackend(EmailBackend):
+    """locmem backend that refuses mail for addresses starting with ``bounce``."""
+
+    def send_messages(self, messages):
+        if any(address.startswith("bounce") for message in messages for address in message.to):
+            raise ConnectionError("mailbox unavailable")
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    NOTIFICATIONS_SEND_IN_PROCESS=False,
+)
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Physics")
+        cls.admin = User.objects.create_user("admin@example.com", role=UserRole.ADMIN, full_name="Admin")
+        cls.meet = Meet.objects.create(
+            name="Annual Meet",
+            start_date=datetime.date(2026, 1, 10),
+            end_date=datetime.date(2026, 1, 12),
+            status=MeetStatus.ACTIVE,
+        )
+        cls.event = Event.objects.create(meet=cls.meet, name="<100m> Sprint")
+        cls.students = [
+            User.objects.create_user(f"student{i}@example.com", full_name=f"Student {i}", department=department)
+            for i in range(20)
+        ]
+
+    def _register(self, student):
+        registration = Registration.objects.create(event=self.event, participant=student, registered_by=self.admin)
+        notifications.registration_confirmed(registration, self.admin)
+        return registration
+
+    def test_plain_text_is_not_html_escaped(self):
+        student = User.objects.create_user("dsouza@example.com", full_name="D'Souza & Co")
+        self._register(student)
+
+        body = Notification.objects.get(recipient=student).body
+        self.assertIn("Hello D'Souza & Co,", body)
+        self.assertIn("<100m> Sprint", body)
+
+    def test_send_due_sends_batches_over_locmem(self):
+        for student in self.students:
+            self._register(student)
+
+        sent, attempted, seconds = notifications.send_due(batch_size=7)
+
+        self.assertEqual((sent, attempted), (20, 20))
+        self.assertGreater(seconds, 0)
+        self.assertEqual(len(mail.outbox), 20)
+        self.assertFalse(Notification.objects.exclude(status=NotificationStatus.SENT).exists())
+        self.assertEqual(notifications.send_due()[:2], (0, 0))
+
+    def test_command_reports_throughput(self):
+        for student in self.students:
+            self._register(student)
+
+        out = StringIO()
+        call_command("send_notifications", "--once", stdout=out)
+
+        self.assertRegex(out.getvalue(), r"Sent 20/20 notifications in [\d.]+ s \([\d,]+ msg/s\)")
+        self.assertEqual(len(mail.outbox), 20)
+
+    @override_settings(EMAIL_BACKEND="meet.tests.test_notifications.RejectingBackend")
+    def test_failures_are_retried_with_backoff(self):
+        bounce = User.objects.create_user("bounce@example.com", full_name="Bounce")
+        self._register(bounce)
+        self._register(self.students[0])
+
+        self.assertEqual(notifications.send_due()[:2], (1, 2))
+        failed = Notification.objects.get(recipient=bounce)
+        self.assertEqual(failed.status, NotificationStatus.PENDING)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("mailbox unavailable", failed.last_error)
+        self.assertGreater(failed.send_after, timezone.now())
+        # not due again until the backoff has passed
+        self.assertEqual(notifications.send_due()[:2], (0, 0))
+
+        for attempt in range(2, notifications.MAX_ATTEMPTS + 1):
+            Notification.objects.filter(pk=failed.pk).update(send_after=timezone.now() - timedelta(seconds=1))
+            notifications.send_due()
+            failed.refresh_from_db()
+            self.assertEqual(failed.attempts, attempt)
+        self.assertEqual(failed.status, NotificationStatus.FAILED)
+
+    def test_schedule_change_notifies_each_registrant_once(self):
+        second = Event.objects.create(meet=self.meet, name="Long Jump")
+        for student in self.students[:5]:
+            Registration.objects.create(event=self.event, participant=student)
+        Registration.objects.create(event=second, participant=self.students[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            meet = Meet.objects.get(pk=self.meet.pk)
+            meet.end_date = datetime.date(2026, 1, 14)
+            meet.save()
+
+        queued = Notification.objects.filter(kind=NotificationKind.SCHEDULE_CHANGED)
+        self.assertEqual(queued.count(), 5)
+        self.assertIn("<100m> Sprint, Long Jump", queued.get(recipient=self.students[0]).body)
+        self.assertIn("14 January 2026", queued.first().body)
+
+    def test_unchanged_schedule_sends_nothing(self):
+        Registration.objects.create(event=self.event, participant=self.students[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            meet = Meet.objects.get(pk=self.meet.pk)
+            meet.name = "Renamed Meet"
+            meet.save()
+
+        self.assertFalse(Notification.objects.filter(kind=NotificationKind.SCHEDULE_CHANGED).exists())
@@ -0,0 +1,206 @@
+import datetime
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase
+
+from accounts.models import User
+from meet import results
+from meet.models import Bib, Event, Meet, MeetStatus, Registration, Result, ResultStatus
+
+
+class ResultsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.meet = Meet.objects.create(
+            name="Annual Meet",
+            start_date=datetime.date(2026, 1, 10),
+            end_date=datetime.date(2026, 1, 12),
+            status=MeetStatus.ACTIVE,
+        )
+        cls.sprint = Event.objects.create(meet=cls.meet, name="100m")
+        cls.relay = Event.objects.create(meet=cls.meet, name="400m")
+        cls.students = [
+            User.objects.create_user(f"runner{i}@example.com", full_name=f"Runner {i}", register_number=f"R{i:03d}")
+            for i in range(20)
+        ]
+        for event in (cls.sprint, cls.relay):
+            Registration.objects.bulk_create([Registration(event=event, participant=student) for student in cls.students])
+        Bib.objects.bulk_create([
+            Bib(meet=cls.meet, participant=student, number=100 + i) for i, student in enumerate(cls.students)
+        ])
+
+    def setUp(self):
+        self.folder = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.index = results.ResultIndex(self.meet.id)
+
+    def simulate(self, folder=None, **options):
+        call_command(
+            "simulate_timing_system",
+            self.meet.id,
+            str(folder or self.folder),
+            seed=7,
+            unknown=0,
+            stdout=mock.Mock(),
+            **options,
+        )
+        return sorted((folder or self.folder).glob("*.lif"))
+
+    def registration(self, event, student):
+        return Registration.objects.get(event=event, participant=student)
+
+
+class ParserTests(ResultsTestCase):
+    def test_parse_lif(self):
+        rows = list(results.parse_lif([
+            "12,2,3,100m,+0.0,m/s\n",
+            "1,0105,4,Doe,Jane,,10.85\n",
+            "DNF,REG:r007,5,Roe,Rick,,\n",
+            "\n",
+        ]))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(
+            rows[0],
+            {
+                "event": "100m", "round": 2, "heat": 3, "place": 1, "kind": "bib",
+                "code": "0105", "mark": "10.85", "status": ResultStatus.FINISHED,
+            },
+        )
+        self.assertEqual((rows[1]["kind"], rows[1]["code"]), ("register_number", "R007"))
+        self.assertEqual((rows[1]["status"], rows[1]["place"], rows[1]["mark"]), (ResultStatus.DNF, None, ""))
+
+    def test_parse_csv(self):
+        rows = list(results.parse_csv([
+            "Event,Register_Number,Bib,Place,Time\n",
+            "100m,R001,,1,1:02.45\n",
+            "100m,,101,DQ,\n",
+        ]))
+
+        self.assertEqual([(row["kind"], row["code"]) for row in rows], [("register_number", "R001"), ("bib", "101")])
+        self.assertEqual(rows[1]["status"], ResultStatus.DQ)
+        self.assertAlmostEqual(results.parse_mark(rows[0]["mark"]), 62.45)
+
+    def test_parse_csv_needs_event_and_code_columns(self):
+        with self.assertRaises(ValueError):
+            list(results.parse_csv(["name,time\n", "Jane,10.1\n"]))
+
+
+class ImportTests(ResultsTestCase):
+    def test_imports_simulated_files(self):
+        files = self.simulate()
+
+        reports = [results.import_file(path, self.index) for path in files]
+
+        self.assertTrue(all(report.error is None and not report.unmatched for report in reports))
+        self.assertEqual(sum(report.written for report in reports), 40)
+        self.assertEqual(Result.objects.filter(registration__event__meet=self.meet).count(), 40)
+
+    def test_bib_and_register_number_do_not_collide(self):
+        # a numeric register number equal to someone else's bib
+        User.objects.filter(pk=self.students[0].pk).update(register_number="105")
+        path = self.folder / "collide.csv"
+        path.write_text("event,bib,register_number,place,time\n100m,105,,1,10.5\n100m,,105,2,10.9\n")
+
+        report = results.import_file(path, self.index)
+
+        self.assertEqual(report.written, 2)
+        self.assertEqual(Result.objects.get(registration=self.registration(self.sprint, self.students[5])).place, 1)
+        self.assertEqual(Result.objects.get(registration=self.registration(self.sprint, self.students[0])).place, 2)
+
+    def test_reimport_updates_in_place(self):
+        path = self.folder / "heat.lif"
+        path.write_text("1,1,1,100m\n1,100,1,Doe,Jane,,10.85\n2,101,2,Roe,Rick,,11.02\n")
+        results.import_file(path, self.index)
+        results.import_file(path, self.index)
+        self.assertEqual(Result.objects.count(), 2)
+
+        path.write_text("1,1,1,100m\n1,101,2,Roe,Rick,,10.70\n2,100,1,Doe,Jane,,10.85\n")
+        report = results.import_file(path, self.index)
+
+        self.assertEqual(report.written, 2)
+        self.assertEqual(Result.objects.count(), 2)
+        updated = Result.objects.get(registration=self.registration(self.sprint, self.students[1]))
+        self.assertEqual((updated.place, updated.mark, updated.mark_seconds), (1, "10.70", 10.7))
+
+    def test_unknown_codes_are_reported(self):
+        path = self.folder / "heat.lif"
+        path.write_text("1,1,1,100m\n1,999,1,Who,Knows,,10.85\n2,100,2,Doe,Jane,,11.02\n")
+
+        report = results.import_file(path, self.index)
+
+        self.assertEqual((report.rows, report.written), (2, 1))
+        self.assertEqual(report.unmatched, [("100m", "999")])
+
+    def test_ambiguous_event_names_are_reported(self):
+        Event.objects.filter(pk=self.relay.pk).update(name="100M")
+        path = self.folder / "heat.csv"
+        path.write_text(f"event,bib,place,time\n100m,100,1,10.85\n{self.sprint.pk},101,2,11.02\n")
+
+        report = results.import_file(path, self.index)
+
+        self.assertEqual(report.written, 1)
+        self.assertEqual(report.unmatched, [("100m", "100")])
+        self.assertEqual(Result.objects.get().registration, self.registration(self.sprint, self.students[1]))
+
+    def test_database_error_fails_the_whole_file(self):
+        files = self.simulate(heat_size=20)
+
+        with mock.patch("meet.results._write", side_effect=DatabaseError("foreign key violation")), \
+                self.assertLogs("meet.results", "ERROR"):
+            report = results.import_file(files[0], self.index)
+
+        self.assertIn("foreign key violation", report.error)
+        self.assertEqual(report.written, 0)
+        self.assertFalse(Result.objects.exists())
+
+
+# watch() releases stale connections between files, which would close the
+# connection a TestCase keeps its transaction on
+@mock.patch("meet.results.close_old_connections")
+class WatchTests(ResultsTestCase):
+    def run_watch(self, expected):
+        reports = []
+        for report in results.watch(self.folder, self.meet.id, interval=0.01, stop=lambda: len(reports) >= expected):
+            reports.append(report)
+        return reports
+
+    def test_imports_and_moves_dropped_files(self, close_old_connections):
+        outbox = self.folder / "outbox"
+        outbox.mkdir()
+        for path in self.simulate(outbox):
+            path.rename(self.folder / path.name)
+        (self.folder / "broken.lif").write_text("")
+        (self.folder / "notes.txt").write_text("ignored")
+        expected = len(list(self.folder.glob("*.lif")))
+
+        reports = self.run_watch(expected)
+
+        self.assertEqual(len(reports), expected)
+        self.assertEqual([path.name for path in (self.folder / "failed").iterdir()], ["broken.lif"])
+        self.assertEqual(len(list((self.folder / "processed").iterdir())), expected - 1)
+        self.assertEqual(Result.objects.count(), 40)
+        self.assertTrue((self.folder / "notes.txt").exists())
+
+    def test_database_error_moves_file_to_failed_and_keeps_watching(self, close_old_connections):
+        (self.folder / "a.lif").write_text("1,1,1,100m\n1,100,1,Doe,Jane,,10.85\n")
+        (self.folder / "b.lif").write_text("1,1,1,400m\n1,100,1,Doe,Jane,,50.10\n")
+        real_write = results._write
+        calls = []
+
+        def flaky_write(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise DatabaseError("foreign key violation")
+            real_write(batch)
+
+        with mock.patch("meet.results._write", side_effect=flaky_write), self.assertLogs("meet.results", "ERROR"):
+            reports = self.run_watch(2)
+
+        self.assertEqual([report.error is None for report in reports], [False, True])
+        self.assertEqual(len(list((self.folder / "failed").iterdir())), 1)
+        self.assertEqual(len(list((self.folder / "processed").iterdir())), 1)
+        self.assertEqual(Result.objects.count(), 1)
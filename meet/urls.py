@@ -1,5 +1,14 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import MeetViewSet, EventViewSet, RegistrationViewSet
+from .views import (
+    MeetViewSet,
+    EventViewSet,
+    RegistrationViewSet,
+    ParticipationAnalyticsView,
+    CheckInScanView,
+    CheckInRosterView,
+    SyncView,
+)
 
 router = DefaultRouter()
 router.register("meets", MeetViewSet)
@@ -7,4 +16,9 @@ router.register("events", EventViewSet)
 router.register("registrations", RegistrationViewSet, basename="registration")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("analytics/participation/", ParticipationAnalyticsView.as_view(), name="participation-analytics"),
+    path("sync/", SyncView.as_view(), name="sync"),
+    path("checkin/<int:event_id>/scan/", CheckInScanView.as_view(), name="checkin-scan"),
+    path("checkin/<int:event_id>/roster/", CheckInRosterView.as_view(), name="checkin-roster"),
+]
@@ -0,0 +1,55 @@
+"""
+Cheap version stamps.
+
+A collection's stamp is ``(max(updated_at), count)`` from a single
+aggregate query: edits move the timestamp and deletions move the count,
+so the full query and serializer only run when something changed.
+
+Generations are cache-held counters bumped by model signals, for cached
+results that should not pay even the aggregate query.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+
+def collection_stamp(queryset):
+    row = queryset.order_by().aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+    return row["last_modified"], row["count"]
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def latest(*timestamps):
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return max(timestamps) if timestamps else None
+
+
+def generation(scope):
+    """Current generation counter for ``scope``, kept in the cache."""
+    return cache.get_or_set(f"generation:{scope}", time.time_ns, None)
+
+
+def generations(scopes):
+    """``{scope: generation}`` for many scopes with one cache round trip."""
+    keys = {f"generation:{scope}": scope for scope in scopes}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {scope: found[key] for key, scope in keys.items()}
+
+
+def bump(*scopes):
+    for scope in scopes:
+        try:
+            cache.incr(f"generation:{scope}")
+        except ValueError:
+            # evicted or never read: start from a value no earlier key used
+            cache.set(f"generation:{scope}", time.time_ns(), None)
@@ -1,28 +1,82 @@
+import threading
+
+from django.db import DatabaseError, IntegrityError, transaction
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.fields import DateTimeField
+from rest_framework.views import APIView
 
+from accounts.models import UserRole
+from .analytics import INTERVALS, participation
+from . import changelog, checkin, rollover, warmup
+from .conditional import ConditionalGetMixin
+from .idempotency import IdempotentCreateMixin
 from .models import Meet, Event, Registration
-from .serializers import MeetSerializer, EventSerializer, RegistrationSerializer
+from .serializers import MeetCloneSerializer, MeetSerializer, EventSerializer, RegistrationSerializer
 from .permissions import IsAdminOrCoordinator
+from .renderers import PARSER_CLASSES, RENDERER_CLASSES
+from .rows import RowListMixin
+from .shaping import ShapedViewSetMixin
+
+
 
+class MeetAPIViewSet(ConditionalGetMixin, ShapedViewSetMixin, RowListMixin, ModelViewSet):
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
 
 
-class MeetViewSet(ModelViewSet):
+
+class MeetViewSet(MeetAPIViewSet):
     queryset = Meet.objects.all()
     serializer_class = MeetSerializer
     permission_classes = [IsAuthenticated, IsAdminOrCoordinator]
 
+    def _check_rollover_allowed(self):
+        # the same roles that may add and change meets in the admin
+        if self.request.user.role not in (UserRole.ADMIN, UserRole.FACULTY_COORDINATOR):
+            raise PermissionDenied("Only admins and faculty coordinators can roll meets over.")
+
+    @action(detail=True, methods=["post"])
+    def clone(self, request, pk=None):
+        """Copy the meet and its events as a draft, optionally re-registering participants."""
+        self._check_rollover_allowed()
+        meet = self.get_object()
+        params = MeetCloneSerializer(data=request.data, context={
+            "start_date": rollover.next_year(meet.start_date),
+            "end_date": rollover.next_year(meet.end_date),
+        })
+        params.is_valid(raise_exception=True)
+        clone, events, registrations = rollover.clone_meet(meet, registered_by=request.user, **params.validated_data)
+        data = MeetSerializer(clone).data
+        data.update(events=events, registrations=registrations)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["post"])
+    def complete(self, request, pk=None):
+        """Close all of the meet's events and mark it completed."""
+        self._check_rollover_allowed()
+        meet = self.get_object()
+        _, events = rollover.complete_meets([meet.pk])
+        meet.refresh_from_db()
+        data = MeetSerializer(meet).data
+        data.update(closed_events=events)
+        return Response(data)
 
 
-class EventViewSet(ModelViewSet):
+
+class EventViewSet(MeetAPIViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated, IsAdminOrCoordinator]
 
 
 
-class RegistrationViewSet(ModelViewSet):
+class RegistrationViewSet(IdempotentCreateMixin, MeetAPIViewSet):
     serializer_class = RegistrationSerializer
     permission_classes = [IsAuthenticated]
 
@@ -36,8 +90,163 @@ class RegistrationViewSet(ModelViewSet):
         if event.meet.status != "ACTIVE":
             raise PermissionDenied("Meet is not active")
 
-        serializer.save(
-            participant=self.request.user,
-            registered_by=self.request.user
-        )
+        already = ValidationError({"event": ["You are already registered for this event."]})
+        if Registration.objects.filter(event=event, participant=self.request.user).exists():
+            raise already
+
+        try:
+            with transaction.atomic():
+                serializer.save(
+                    participant=self.request.user,
+                    registered_by=self.request.user
+                )
+        except IntegrityError:
+            # lost a race with a concurrent request for the same pair
+            raise already
+
+
+
+def _int_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: "Must be an integer."})
+
+
+
+class ParticipationAnalyticsView(APIView):
+    """Participation by meet, event, event type, department and gender, plus a registration histogram."""
+
+    permission_classes = [IsAuthenticated, IsAdminOrCoordinator]
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
+
+    def get(self, request):
+        interval = request.query_params.get("interval", "day")
+        if interval not in INTERVALS:
+            raise ValidationError({"interval": f"One of: {', '.join(INTERVALS)}."})
+
+        department_id = _int_param(request, "department")
+        if request.user.role != UserRole.ADMIN:
+            # coordinators only see their own department
+            department_id = request.user.department_id
+
+        return Response(participation(_int_param(request, "meet"), department_id, interval))
+
+
+
+class SyncView(APIView):
+    """
+    Delta sync: ``?since=<cursor>`` returns meets, events and registrations
+    changed after the cursor, plus the ids of deleted ones; follow
+    ``cursor`` while ``more`` is true. Without ``since`` it pages through
+    everything: follow ``page`` while ``more`` is true, then sync from
+    ``cursor``.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminOrCoordinator]
+    renderer_classes = RENDERER_CLASSES
+
+    def get(self, request):
+        department_id = None
+        if request.user.role != UserRole.ADMIN:
+            # coordinators only sync their own department's registrations
+            department_id = request.user.department_id
+
+        since = _int_param(request, "since")
+        limit = _int_param(request, "limit")
+        if since is None:
+            try:
+                return Response(changelog.snapshot(department_id, request.query_params.get("page"), limit))
+            except ValueError:
+                raise ValidationError({"page": "Not a page returned by an earlier sync."})
+        return Response(changelog.changes_since(since, department_id, limit))
+
+
+class CheckInScanView(APIView):
+    """
+    Check a register number or bib in at an event gate.
+
+    Send ``{"code": ...}`` for a live scan, or ``{"scans": [{"code": ...,
+    "scanned_at": ...}, ...]}`` to upload what a device recorded offline.
+    Add ``"kind": "bib"`` or ``"register_number"`` (or prefix the code with
+    ``BIB:`` / ``REG:``) to say what was scanned.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminOrCoordinator]
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
+    throttle_scope = "checkin"
+
+    def post(self, request, event_id):
+        if "scans" not in request.data:
+            return Response(self._scan(event_id, request.data, request.user.id))
+
+        scans = request.data["scans"]
+        if not isinstance(scans, list):
+            raise ValidationError({"scans": "Must be a list."})
+        return Response({"results": [self._scan(event_id, scan, request.user.id) for scan in scans]})
+
+    def _scan(self, event_id, scan, user_id):
+        if not hasattr(scan, "get") or not scan.get("code"):
+            raise ValidationError({"code": "This field is required."})
+        kind = scan.get("kind") or None
+        if kind is not None and kind not in checkin.KINDS:
+            raise ValidationError({"kind": f"Must be one of: {', '.join(checkin.KINDS)}."})
+        scanned_at = scan.get("scanned_at")
+        if scanned_at:
+            scanned_at = DateTimeField().to_internal_value(scanned_at)
+
+        result = checkin.scan(event_id, scan["code"], user_id, scanned_at, kind)
+        if result is None:
+            raise NotFound("No such event.")
+        outcome, entry = result
+        return {"code": scan["code"], "outcome": outcome, "entry": entry}
+
+
+class CheckInRosterView(APIView):
+    """The event's roster for devices that have to keep scanning offline."""
+
+    permission_classes = [IsAuthenticated, IsAdminOrCoordinator]
+    renderer_classes = RENDERER_CLASSES
+
+    def get(self, request, event_id):
+        found = checkin.roster(event_id)
+        if found is None:
+            raise NotFound("No such event.")
+        response = Response(found.snapshot())
+        response["Content-Disposition"] = f'attachment; filename="roster-event-{event_id}.{request.accepted_renderer.format}"'
+        return response
+
+
+
+_warmup_lock = threading.Lock()
+_warmup_report = None
+
+
+def readiness(request):
+    """
+    Readiness probe: the first call warms this process up, later calls only
+    check the database. Returns 503 until the process can serve requests.
+    """
+    global _warmup_report
+
+    try:
+        with _warmup_lock:
+            if _warmup_report is None:
+                _warmup_report = warmup.run()
+            else:
+                warmup.open_connections()
+    except DatabaseError as exc:
+        return JsonResponse({"ready": False, "error": str(exc)}, status=503)
 
+    return JsonResponse({
+        "ready": True,
+        "warmup": {
+            name: {"count": count, "ms": round(seconds * 1000, 1)}
+            for name, count, seconds in _warmup_report
+        },
+    })
@@ -0,0 +1,74 @@
+"""
+Deploy-time warm-up shared by the ``warmup`` command and the readiness view.
+
+Each step pays a cost the first real request would otherwise pay and
+reports how long it took, so import and compile times can be tracked
+across deploys.
+"""
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+from .lookups import active_events, departments
+from .versions import generations
+
+
+def import_urlconfs():
+    """Import every URLconf and the views, DRF and admin modules behind them."""
+    def walk(patterns):
+        count = 0
+        for pattern in patterns:
+            if hasattr(pattern, "url_patterns"):
+                count += walk(pattern.url_patterns)
+            else:
+                count += 1
+        return count
+
+    return walk(get_resolver().url_patterns)
+
+
+def compile_templates(app_label="accounts"):
+    """Compile every template of ``app_label``; kept by the cached loader when not DEBUG."""
+    root = Path(apps.get_app_config(app_label).path) / "templates"
+    names = sorted(path.relative_to(root).as_posix() for path in root.rglob("*.html"))
+    for name in names:
+        get_template(name)
+    return len(names)
+
+
+def open_connections():
+    """Open (and with CONN_MAX_AGE, keep) one connection per configured database."""
+    for alias in connections:
+        connection = connections[alias]
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    return len(settings.DATABASES)
+
+
+def fill_caches():
+    generations(["registrations", "events", "students"])
+    return len(active_events()) + len(departments())
+
+
+STEPS = [
+    ("urls", import_urlconfs),
+    ("templates", compile_templates),
+    ("database", open_connections),
+    ("caches", fill_caches),
+]
+
+
+def run():
+    """Run every step; return ``[(step, count, seconds), ...]``."""
+    report = []
+    for name, step in STEPS:
+        started = time.perf_counter()
+        count = step()
+        report.append((name, count, time.perf_counter() - started))
+    return report